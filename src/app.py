@@ -1,29 +1,66 @@
 import os
 import io
+import math
+import uuid
 import base64
 import random
-from dash import Dash, html, dcc, Input, Output, State, callback_context, no_update
+from dash import Dash, html, dcc, dash_table, Input, Output, State, Patch, ClientsideFunction, callback_context, no_update
 import dash_cytoscape as cyto
-import networkx as nx
 from graph_logic import (
-    carregar_grafo_txt, salvar_grafo_txt,
-    gerar_elementos_cytoscape, adicionar_aresta, remover_aresta, remover_vertice,
+    carregar_grafo_txt, carregar_grafo_csr, carregar_grafo_bin, eh_snapshot_bin, salvar_grafo_txt, salvar_grafo_bin,
+    EstadoGrafo,
+    bfs_arestas, dfs_arestas, pagina_adjacencia,
 )
+from grafo_csr import GrafoCSR
+from destaque import resultado_percurso, resultado_componentes
+from resumo import agrupar_vertices, gerar_elementos_resumo
+from sessoes import ArmazemSessoes, BackendDisco
+from tarefas import ExecutorTarefas, executar_bfs, executar_dfs, executar_scc, EXECUTANDO, CONCLUIDA, ERRO
+from metricas import metricas, instrumentar_callback, registrar_rotas
 app = Dash(__name__, suppress_callback_exceptions=True)
 
+# Histogramas de tempo por etapa em /metrics (ver módulo metricas)
+registrar_rotas(app.server)
+
+# 'csr' guarda os grafos enviados em vetores CSR em vez de nx.DiGraph
+BACKEND_GRAFO = os.environ.get('GRAFO_BACKEND', 'networkx')
+
+# Acima deste número de arestas, BFS, DFS e SCC rodam em segundo plano, em um
+# pool de processos, sem bloquear o worker que atende a requisição
+LIMITE_SEGUNDO_PLANO = int(os.environ.get('GRAFO_LIMITE_SEGUNDO_PLANO', 50000))
+
+# Acima deste número de elementos (vértices + arestas) o grafo é exibido em
+# modo resumo: cada componente fortemente conexa vira um super-nó, expandido
+# ao ser clicado, e no máximo GRAFO_MAX_GRUPOS super-nós são enviados
+LIMITE_DETALHE = int(os.environ.get('GRAFO_LIMITE_DETALHE', 3000))
+MAX_GRUPOS_RESUMO = int(os.environ.get('GRAFO_MAX_GRUPOS', 500))
+
+# Vértices por página da lista de adjacência
+TAMANHO_PAGINA_ADJACENCIA = 20
+
+# Ações que não alteram o grafo: não cancelam a tarefa em andamento
+ACOES_SEM_ALTERACAO = {'refresh-button'}
+
 #####################################################
 ################### SAVE GRAPH ######################
 #####################################################
 
 @app.callback(
     Output("download-graph", "data"),
-    Input("btn-save-graph", "n_clicks"),
+    [Input("btn-save-graph", "n_clicks"),
+     Input("btn-save-snapshot", "n_clicks")],
+    State('sessao', 'data'),
     prevent_initial_call=True,
 )
-def salvar_grafo(n_clicks):
+@instrumentar_callback
+def salvar_grafo(n_texto, n_snapshot, sessao):
     try:
-        salvar_grafo_txt(G, "graph.txt")  
-        return dcc.send_file("graph.txt")
+        G = sessoes.obter(sessao).G
+        # Gera o arquivo em memória: sessões simultâneas não disputam o mesmo graph.txt.
+        # O snapshot binário (.bin) é carregado bem mais rápido pelo upload
+        if callback_context.triggered_id == 'btn-save-snapshot':
+            return dcc.send_bytes(lambda buffer: salvar_grafo_bin(G, buffer), "graph.bin")
+        return dcc.send_bytes(lambda buffer: salvar_grafo_txt(G, buffer), "graph.txt")
     except Exception as e:
         return html.P(f"Erro ao salvar o grafo: {str(e)}")
 
@@ -31,34 +68,15 @@ def salvar_grafo(n_clicks):
 ################### ZOOM LEVEL ######################
 #####################################################
 
-zoom_level = 2.0  # Nível de zoom inicial
-
-@app.callback(
+# Executado no navegador (assets/destaque.js): cada aba tem o seu próprio zoom
+app.clientside_callback(
+    ClientsideFunction(namespace='grafo', function_name='zoom'),
     Output('cytoscape-grafo', 'zoom'),
     [Input('zoom-in', 'n_clicks'),
      Input('zoom-out', 'n_clicks')],
+    State('cytoscape-grafo', 'zoom'),
     prevent_initial_call=True
 )
-def update_zoom(n_clicks_in, n_clicks_out):
-    global zoom_level
-    ctx = callback_context
-
-    # Determina qual botão foi clicado
-    if not ctx.triggered:
-        return dash.no_update
-
-    button_id = ctx.triggered[0]['prop_id'].split('.')[0]
-
-    # Ajusta o zoom de acordo com o botão clicado
-    if button_id == 'zoom-in':
-        zoom_level += 0.5  # Aumenta o zoom em 50%
-    elif button_id == 'zoom-out':
-        zoom_level -= 0.5  # Diminui o zoom em 25%
-
-    # Limitar o zoom a um intervalo entre 1.0 e 3.0
-    zoom_level = max(1.0, min(zoom_level, 2.5))
-
-    return zoom_level
 
 #####################################################
 ################### CLEAR INPUT #####################
@@ -137,13 +155,22 @@ app.index_string = '''
     </body>
 </html>
 '''
-# Variáveis globais para armazenar o grafo
-G = nx.DiGraph()
-ponderado = False
-orientado = True
-original_edges = []  
+# Estado do grafo de cada sessão (aba do navegador). Com GRAFO_SESSOES_DIR as
+# sessões também são gravadas em disco e compartilhadas entre processos
+# (um diretório em /dev/shm mantém esse compartilhamento em memória); os
+# arquivos expiram após GRAFO_SESSOES_TTL_HORAS sem alteração e somam no
+# máximo GRAFO_SESSOES_DISCO_MB.
+sessoes = ArmazemSessoes(
+    EstadoGrafo,
+    capacidade_bytes=int(os.environ.get('GRAFO_SESSOES_MB', 512)) * 1024 * 1024,
+    backend=BackendDisco(
+        os.environ['GRAFO_SESSOES_DIR'],
+        ttl=float(os.environ.get('GRAFO_SESSOES_TTL_HORAS', 24)) * 3600,
+        capacidade_bytes=int(os.environ.get('GRAFO_SESSOES_DISCO_MB', 4096)) * 1024 * 1024,
+    ) if os.environ.get('GRAFO_SESSOES_DIR') else None,
+)
 
-app.layout = html.Div([
+layout_principal = html.Div([
     # Cabeçalho com imagem
     html.H2([
         html.Img(src='/assets/graph.png', style={'width': 'auto', 'height': '120px', 'margin-right': '5px'}),
@@ -200,6 +227,9 @@ app.layout = html.Div([
                     html.Button('BFS', id='btn-bfs', className='btn button-green w-100 mb-2'),
                     html.Button('DFS', id='btn-dfs', className='btn button-black w-100 mb-2'),
                     html.Button('SCC', id='btn-scc', className='btn button-green w-100'),
+                    html.Button('Cancelar Tarefa', id='btn-cancelar-tarefa', className='btn btn-danger w-100 mt-2'),
+                    # Consulta o andamento da tarefa em segundo plano, quando houver uma
+                    dcc.Interval(id='intervalo-tarefas', interval=1000, disabled=True),
                 ]),
             ]),
 
@@ -209,7 +239,8 @@ app.layout = html.Div([
                 cyto.Cytoscape(
                     className='shadow-sm card p-3 mb-2',
                     id='cytoscape-grafo',
-                    layout={'name': 'cose'},
+                    # Posições calculadas no servidor (ver posicoes.py)
+                    layout={'name': 'preset'},
                     panningEnabled=True,
                     userZoomingEnabled=True,
                     zoomingEnabled=True,
@@ -308,6 +339,16 @@ app.layout = html.Div([
                             'target-arrow-color': 'blue'
                         }
                     },
+                    {
+                        # Super-nós do modo resumo
+                        'selector': '.grupo',
+                        'style': {
+                            'shape': 'round-rectangle',
+                            'background-color': '#d1fccf',
+                            'width': 'mapData(tamanho, 2, 1000, 40, 120)',
+                            'height': 'mapData(tamanho, 2, 1000, 40, 120)',
+                        }
+                    },
                 ],
                     tapNodeData={'selector': 'node'},
                     tapEdgeData={'selector': 'edge'},
@@ -330,6 +371,7 @@ app.layout = html.Div([
                             children=html.Button('Enviar Grafo', className='btn button-green', style={'margin-left': '0px', 'width': '120px', 'height': '38px'})
                         ),
                         html.Button('Salvar Grafo', id='btn-save-graph', className='btn button-black', style={'margin-left': '5px', 'width': '120px', 'height': '38px'}),
+                        html.Button('Salvar Snapshot', id='btn-save-snapshot', className='btn button-black', style={'margin-left': '5px', 'width': '140px', 'height': '38px'}),
                     ], style={
                         'z-index': '1000',
                         'margin-bottom': '3px'
@@ -380,6 +422,37 @@ app.layout = html.Div([
                             'font-family': 'Arial',
                             'padding': '10px 0 7px 10px',
                         }),
+                        # Texto do resultado do algoritmo: um único nó de texto, montado no navegador
+                        html.Div(id='resultado-texto', style={
+                            'font-family': 'Arial',
+                            'font-weight': 'bold',
+                            'white-space': 'pre-line',
+                            'overflow-wrap': 'anywhere',
+                            'padding': '0 10px 7px 10px',
+                        }),
+                    ]),
+                    # Lista de adjacência paginada no servidor: só a página visível é enviada
+                    html.Div(className='col-md-12 card p-1 mb-4 shadow-sm', style={'margin': '5px 0 0 12px', 'width': '98%', 'font-family': 'Arial'}, children=[
+                        html.P("Lista de Adjacência: ", style={'padding': '10px 0 0 10px'}),
+                        dash_table.DataTable(
+                            id='tabela-adjacencia',
+                            columns=[
+                                {'name': 'Vértice', 'id': 'vertice'},
+                                {'name': 'Vizinhos', 'id': 'vizinhos'},
+                            ],
+                            data=[],
+                            page_action='custom',
+                            page_current=0,
+                            page_size=TAMANHO_PAGINA_ADJACENCIA,
+                            style_cell={'text-align': 'left', 'font-family': 'Arial', 'white-space': 'normal'},
+                            style_header={'font-weight': 'bold'},
+                        ),
+                        # Versão do grafo exibido: muda a cada alteração e recarrega a página da tabela
+                        dcc.Store(id='versao-grafo'),
+                        # Resultado compacto do último algoritmo, exibido pelo navegador (assets/destaque.js)
+                        dcc.Store(id='resultado-algoritmo'),
+                        # Dados do último super-nó tocado no modo resumo
+                        dcc.Store(id='grupo-tocado'),
                     ]),
                 ]),
             ])
@@ -387,579 +460,599 @@ app.layout = html.Div([
     ]),
 ])
 
+def criar_layout():
+    # Cada aba recebe um id de sessão próprio, guardado no sessionStorage
+    return html.Div([
+        dcc.Store(id='sessao', storage_type='session', data=uuid.uuid4().hex),
+        layout_principal,
+    ])
+
+app.layout = criar_layout
+
 #####################################################
 ################## UPDATE GRAPH #####################
 #####################################################
 
+def modo_resumo(estado):
+    return estado.G.number_of_nodes() + estado.num_arestas > LIMITE_DETALHE
+
+def elementos_resumo(estado):
+    # Elementos do modo resumo, memorizados por versão do grafo e grupos expandidos
+    G = estado.G
+
+    def calcular():
+        rotulos, componente = estado.memorizar('scc', lambda: estado.scc.componentes(G))
+        grupo = agrupar_vertices(componente, MAX_GRUPOS_RESUMO)
+        elements = gerar_elementos_resumo(G, rotulos, grupo, estado.expandidos, G.is_directed())
+        return estado.posicoes.posicionar_elementos(elements)
+
+    return estado.memorizar('resumo', calcular, frozenset(estado.expandidos))
+
+def elementos_para_cliente(estado):
+    # Grafos grandes são enviados resumidos (o espelho não é usado); nos
+    # demais, envia apenas as alterações feitas desde a última resposta
+    # (Patch), ou a lista completa quando o cliente não está sincronizado
+    with metricas.etapa('elementos'):
+        if modo_resumo(estado):
+            estado.elementos.invalidar()
+            return elementos_resumo(estado)
+
+        operacoes = estado.elementos.alteracoes()
+        if operacoes is None:
+            return estado.elementos.completa()
+
+        patch = Patch()
+        for operacao, indice, elemento in operacoes:
+            if operacao == 'definir':
+                patch[indice] = elemento
+            elif operacao == 'acrescentar':
+                patch.append(elemento)
+            else:
+                del patch[indice]
+        return patch
+
+def info_grafo(estado, *extras):
+    # Resumo do grafo, seguido do resultado de um algoritmo (se houver). A lista
+    # de adjacência fica na tabela paginada (ver paginar_adjacencia)
+    G = estado.G
+    return [
+        html.P(f"Número de Vértices: ", style={'display': 'inline'}),
+        html.B(f"{G.number_of_nodes()}", style={'display': 'inline'}),
+        html.Br(),
+        html.P(f"Número de Arestas: ", style={'display': 'inline'}),
+        html.B(f"{estado.num_arestas}", style={'display': 'inline'}),
+        html.Br(),
+        html.P(f"Ponderado: ", style={'display': 'inline'}),
+        html.B(f"{'Sim' if estado.ponderado else 'Não'}", style={'display': 'inline'}),
+        html.Br(),
+        html.P(f"Orientado: ", style={'display': 'inline'}),
+        html.B(f"{'Sim' if estado.orientado else 'Não'}", style={'display': 'inline'}),
+        html.Br(),
+        *extras,
+    ]
+
 @app.callback(
-    [Output('cytoscape-grafo', 'elements'),
-     Output('grafo-info', 'children')],
-    [Input('upload-data', 'contents'),
-     Input('btn-add-node', 'n_clicks'),
-     Input('btn-add-edge', 'n_clicks'),
-     Input('btn-remove-node', 'n_clicks'),
-     Input('btn-remove-edge', 'n_clicks'),
-     Input('btn-to-directed', 'n_clicks'),
-     Input('btn-to-undirected', 'n_clicks'),
-     Input('btn-add-weight', 'n_clicks'),
-     Input('btn-make-weighted', 'n_clicks'),
-     Input('btn-make-unweighted', 'n_clicks'),
-     Input('btn-bfs', 'n_clicks'),
-     Input('btn-dfs', 'n_clicks'),
-     Input('btn-scc', 'n_clicks'),
-     Input('refresh-button', 'n_clicks'),
-     Input('delete-button', 'n_clicks'),
-     Input('cytoscape-grafo', 'selectedNodeData'),
-     Input('cytoscape-grafo', 'selectedEdgeData')],
-    [State('upload-data', 'filename'),
-     State('add-node', 'value'),
-     State('add-edge-weight', 'value'),
-     State('cytoscape-grafo', 'elements')]
+    [Output('tabela-adjacencia', 'data'),
+     Output('tabela-adjacencia', 'page_count'),
+     Output('tabela-adjacencia', 'page_current')],
+    [Input('versao-grafo', 'data'),
+     Input('tabela-adjacencia', 'page_current'),
+     Input('tabela-adjacencia', 'page_size')],
+    State('sessao', 'data'),
 )
+@instrumentar_callback
+def paginar_adjacencia(versao, page_current, page_size, sessao):
+    estado = sessoes.obter(sessao)
+    G = estado.G
+    page_count = max(1, math.ceil(G.number_of_nodes() / page_size))
+    pagina = min(page_current or 0, page_count - 1)  # O grafo pode ter encolhido
+    inicio = pagina * page_size
+    linhas = estado.memorizar('adjacencia', lambda: pagina_adjacencia(G, inicio, inicio + page_size), inicio, page_size)
+    return linhas, page_count, pagina
+
+
+def vertices_visiveis(estado):
+    # No modo resumo, os vértices exibidos (dos grupos expandidos); None no modo completo
+    if not modo_resumo(estado):
+        return None
+    return {
+        element['data']['id'] for element in elementos_resumo(estado)
+        if 'source' not in element['data'] and 'representante' not in element['data']
+    }
+
+def renderizar_percurso(estado, algoritmo, start_node, resultado):
+    # Resultado compacto de uma BFS ou DFS ('bfs' ou 'dfs'): o destaque e o
+    # texto são gerados no navegador a partir dele (assets/destaque.js)
+    with metricas.etapa('destaque'):
+        destaque = resultado_percurso(algoritmo, start_node, resultado, estado.orientado, vertices_visiveis(estado))
+    # O cliente passa a ter a lista colorida: a próxima alteração reenvia a lista completa
+    estado.elementos.invalidar()
+    return destaque, info_grafo(estado)
+
+def renderizar_scc(estado, rotulos, componente):
+    # No modo resumo só vão ao cliente os vértices visíveis (grupos expandidos)
+    with metricas.etapa('destaque'):
+        destaque = resultado_componentes(rotulos, componente, vertices_visiveis(estado))
+    estado.elementos.invalidar()  # O cliente passa a ter a lista colorida
+    return destaque, info_grafo(estado)
 
-def update_graph(contents, add_node_clicks, add_edge_clicks, remove_node_clicks, remove_edge_clicks, refresh_button, delete_button,
-                to_directed_clicks, to_undirected_clicks, add_weight_clicks, bfs_clicks, btn_make_weighted_clicks, scc_clicks, 
-                btn_make_unweighted_clicks, dfs_clicks, selected_nodes, selected_edges, filename, add_node, add_edge_weight, elements):
-    
-    global G, ponderado, orientado, original_edges
-    ctx = callback_context
-    # Lista para armazenar as arestas originais do grafo orientado
+#####################################################
+############## TAREFAS EM SEGUNDO PLANO #############
+#####################################################
 
-    
-    if not ctx.triggered:
-        return gerar_elementos_cytoscape(G), [html.P("Nenhum grafo carregado.")]
-    
-    button_id = ctx.triggered[0]['prop_id'].split('.')[0]
+# Pool de processos compartilhado pelas sessões deste processo. Os ids das
+# tarefas só valem aqui: com sessões compartilhadas entre workers
+# (BackendDisco), a tarefa guarda o processo que a criou
+executor_tarefas = ExecutorTarefas()
+ID_PROCESSO = uuid.uuid4().hex
+
+def tarefa_deste_processo(tarefa):
+    return tarefa.get('processo') == ID_PROCESSO
+
+def cancelar_tarefa(estado):
+    # O executor descarta a tarefa cancelada assim que ela termina
+    if estado.tarefa is not None:
+        if tarefa_deste_processo(estado.tarefa):
+            executor_tarefas.cancelar(estado.tarefa['id'])
+        estado.tarefa = None
+
+def submeter_tarefa(estado, algoritmo, funcao, *args):
+    # O processo filho recebe o grafo em CSR, que é serializado sem um objeto por aresta
+    cancelar_tarefa(estado)
+    # A conversão é O(V + E) em Python: memorizada por versão, é feita uma
+    # única vez para todas as buscas enquanto o grafo não muda
+    G = estado.G if isinstance(estado.G, GrafoCSR) else estado.memorizar('csr', lambda: GrafoCSR.de_networkx(estado.G))
+    estado.tarefa = {
+        'id': executor_tarefas.submeter(funcao, G, *args),
+        'algoritmo': algoritmo,
+        'args': args,
+        'chave': estado.chave_resultado(algoritmo, *args),  # Onde guardar o resultado
+        'processo': ID_PROCESSO,
+    }
+    return no_update, html.P(f"Executando {algoritmo.upper()} em segundo plano...")
 
+@app.callback(
+    [Output('resultado-algoritmo', 'data', allow_duplicate=True),
+     Output('grafo-info', 'children', allow_duplicate=True),
+     Output('intervalo-tarefas', 'disabled', allow_duplicate=True)],
+    Input('intervalo-tarefas', 'n_intervals'),
+    State('sessao', 'data'),
+    prevent_initial_call=True,
+)
+@instrumentar_callback
+def acompanhar_tarefa(n_intervals, sessao):
+    estado = sessoes.obter(sessao)
+    tarefa = estado.tarefa
+    if tarefa is None:
+        return no_update, no_update, True
+
+    algoritmo = tarefa['algoritmo'].upper()
+    if not tarefa_deste_processo(tarefa):
+        # Tarefa de outro worker: só ele conhece o andamento. O intervalo
+        # continua consultando até uma requisição chegar a esse worker
+        return no_update, html.P(f"Executando {algoritmo} em segundo plano..."), False
+
+    situacao = executor_tarefas.consultar(tarefa['id'])
+    if situacao['estado'] == EXECUTANDO:
+        return no_update, html.P(f"Executando {algoritmo} em segundo plano: {situacao['progresso']:.0%}"), False
+
+    estado.tarefa = None
     try:
-        if button_id == 'upload-data' and contents is not None:
-            content_type, content_string = contents.split(',')
-            decoded = base64.b64decode(content_string).decode('utf-8')
+        if situacao['estado'] == CONCLUIDA:
+            estado.resultados.guardar(tarefa['chave'], situacao['resultado'])
+            if tarefa['algoritmo'] == 'scc':
+                rotulos, componente = situacao['resultado']
+                estado.scc.definir(rotulos, componente)
+                destaque, info = renderizar_scc(estado, rotulos, componente)
+            else:
+                start_node, = tarefa['args']
+                destaque, info = renderizar_percurso(estado, tarefa['algoritmo'], start_node, situacao['resultado'])
+            return destaque, info, True
+        if situacao['estado'] == ERRO:
+            return no_update, html.P(f"Erro: {situacao['erro']}"), True
+        return no_update, html.P(f"Tarefa {algoritmo} cancelada."), True
+    finally:
+        sessoes.salvar(sessao, estado)
 
-            temp_filename = 'temp_graph.txt'
-            with open(temp_filename, 'w') as temp_file:
-                temp_file.write(decoded)
+@app.callback(
+    Output('grafo-info', 'children', allow_duplicate=True),
+    Input('btn-cancelar-tarefa', 'n_clicks'),
+    State('sessao', 'data'),
+    prevent_initial_call=True,
+)
+@instrumentar_callback
+def cancelar_tarefa_sessao(n_clicks, sessao):
+    # O intervalo encerra a tarefa ao ver o estado 'cancelada'
+    estado = sessoes.obter(sessao)
+    if estado.tarefa is None:
+        return html.P("Nenhuma tarefa em execução.")
+    if not tarefa_deste_processo(estado.tarefa):
+        # Não há como interromper a tarefa de outro worker: a sessão deixa de
+        # esperar por ela, e o worker dono descarta o resultado ao terminar
+        estado.tarefa = None
+        sessoes.salvar(sessao, estado)
+        return html.P("Tarefa cancelada.")
+    executor_tarefas.cancelar(estado.tarefa['id'])
+    return html.P("Cancelando tarefa...")
+
+# Executado no navegador: só os toques em super-nós chegam ao servidor
+app.clientside_callback(
+    ClientsideFunction(namespace='grafo', function_name='grupo'),
+    Output('grupo-tocado', 'data'),
+    Input('cytoscape-grafo', 'tapNodeData'),
+    prevent_initial_call=True,
+)
 
-            G, ponderado, orientado = carregar_grafo_txt(temp_filename)
-            os.remove(temp_filename)
-            elements = gerar_elementos_cytoscape(G)
-            
-            # Atualiza original_edges com as arestas do grafo carregado
-            original_edges = list(G.edges(data=True))  # Salva com dados das arestas
+@app.callback(
+    [Output('cytoscape-grafo', 'elements', allow_duplicate=True),
+     Output('grafo-info', 'children', allow_duplicate=True),
+     Output('resultado-algoritmo', 'data', allow_duplicate=True)],
+    Input('grupo-tocado', 'data'),
+    State('sessao', 'data'),
+    prevent_initial_call=True,
+)
+@instrumentar_callback
+def expandir_grupo(node_data, sessao):
+    # Clicar em um super-nó do modo resumo exibe os vértices do grupo
+    if not node_data or 'representante' not in node_data:
+        return no_update, no_update, no_update
+
+    estado = sessoes.obter(sessao)
+    if node_data['tamanho'] > LIMITE_DETALHE:
+        return no_update, html.P(f"Erro: O grupo tem {node_data['tamanho']} vértices, grande demais para expandir."), no_update
+    try:
+        estado.expandidos.add(node_data['representante'])
+        # A lista muda inteira (e sem cores): o resultado exibido é descartado
+        return elementos_para_cliente(estado), info_grafo(estado), None
+    finally:
+        sessoes.salvar(sessao, estado)
+
+SAIDAS_GRAFO = [
+    Output('cytoscape-grafo', 'elements', allow_duplicate=True),
+    Output('grafo-info', 'children', allow_duplicate=True),
+    Output('intervalo-tarefas', 'disabled', allow_duplicate=True),
+    Output('versao-grafo', 'data', allow_duplicate=True),
+    # Resultado compacto do algoritmo (destaque.py). Os algoritmos não reenviam
+    # os elementos: o navegador colore o grafo a partir dele (assets/destaque.js)
+    Output('resultado-algoritmo', 'data', allow_duplicate=True),
+]
+
+def marca_sessao(estado):
+    # Muda quando muda algo que a sessão grava: o grafo (e a orientação ou os
+    # pesos, que incrementam 'versao'), a tarefa ou as posições do layout
+    return estado.versao, estado.tarefa and estado.tarefa['id'], len(estado.posicoes.xy)
+
+def executar_acao(sessao, acao, funcao, *args, requer_grafo=True):
+    # Corpo comum dos callbacks de ação: cada um recebe só os valores de que
+    # precisa (nunca a lista de elementos do cliente) e 'funcao(estado, *args)'
+    # devolve (elements, info) ou, nos algoritmos, (elements, info, resultado).
+    # As demais ações descartam o resultado exibido
+    with metricas.etapa('sessao'):
+        estado = sessoes.obter(sessao)
+    marca = marca_sessao(estado)
+    try:
+        # Alterar o grafo (ou iniciar outro algoritmo) torna obsoleto o resultado da tarefa atual
+        if acao not in ACOES_SEM_ALTERACAO:
+            cancelar_tarefa(estado)
 
-        if button_id == 'upload-data' and contents is not None:
-            content_type, content_string = contents.split(',')
-            decoded = base64.b64decode(content_string).decode('utf-8')
-            
-            temp_filename = 'temp_graph.txt'
-            with open(temp_filename, 'w') as temp_file:
-                temp_file.write(decoded)
-            
-            G, ponderado, orientado = carregar_grafo_txt(temp_filename)
-            os.remove(temp_filename)
-            elements = gerar_elementos_cytoscape(G)
-        
-        elif button_id == 'btn-add-node':
-            # Verifica se o input não está vazio e se o vértice não existe
-    
-            if add_node and add_node not in G.nodes():
-                G.add_node(add_node)
-                elements = gerar_elementos_cytoscape(G)
-            else:
-                # Retorna uma mensagem de erro se o input estiver vazio ou o vértice já existir
-                return elements, html.P(f"Erro: Vértice '{add_node}' já existe ou o campo está vazio.")
-            if G.number_of_edges() == 0:
-                 orientado = False
-                 ponderado = False
-                
-        
-        elif button_id == 'btn-remove-node':
-            if selected_nodes:
-                for node_data in selected_nodes:
-                    remover_vertice(G, node_data['id'])
-                elements = gerar_elementos_cytoscape(G)
+        try:
+            if requer_grafo and estado.G.number_of_nodes() == 0:
+                elements, info, resultado = no_update, html.P("Nenhum grafo carregado."), []
             else:
-                return elements, html.P("Erro: Nenhum vértice selecionado.")
-
-            if G.number_of_edges() == 0:
-                 orientado = False
-                 ponderado = False
-            
-        elif G.number_of_nodes() == 0:
-            return elements, html.P("Nenhum grafo carregado.")
-
-        elif button_id == 'btn-add-edge':
-            if G.number_of_nodes() == 0:
-                return elements, html.P("Erro: Nenhum grafo carregado.")
-
-            if len(selected_nodes) == 1:
-                source = selected_nodes[0]['id']
-                target = source  # Auto-loop
-
-                adicionar_aresta(G, source, target)
-                if ponderado == True:
-                    G[source][target]['weight'] = 1.0
-                elements = gerar_elementos_cytoscape(G)
-
-                # Adiciona a aresta à lista original_edges
-                original_edges.append((source, target, G[source][target]))
-
-            elif len(selected_nodes) == 2:
-                source = selected_nodes[0]['id']
-                target = selected_nodes[1]['id']
-
-                adicionar_aresta(G, source, target)
-                if ponderado == True:
-                    G[source][target]['weight'] = 1.0  
-                elements = gerar_elementos_cytoscape(G)
-
-                # Adiciona a aresta à lista original_edges
-                original_edges.append((source, target, G[source][target]))
-
-            if G.number_of_edges() > 0 and nx.is_directed(G):
-                orientado = True  
-
-        elif button_id == 'btn-remove-edge':
-            if selected_edges:
-                for edge_data in selected_edges:
-                    source = edge_data['source']
-                    target = edge_data['target']
-                    if G.has_edge(source, target):
-                        G.remove_edge(source, target)
-                        
-                        # Remove a aresta correspondente de original_edges
-                        original_edges = [
-                            edge for edge in original_edges
-                            if not (edge[0] == source and edge[1] == target)
-                        ]
+                elements, info, *resultado = funcao(estado, *args)
+        except Exception as e:
+            elements, info, resultado = elementos_para_cliente(estado), html.P(f"Erro: {str(e)}"), []
+
+        # O intervalo só consulta o servidor enquanto houver tarefa em segundo plano
+        return elements, info, estado.tarefa is None, estado.versao, resultado[0] if resultado else None
+    finally:
+        # Atualiza o tamanho da sessão no LRU e, se algo gravado mudou, grava
+        # no backend: cliques que não alteram o grafo não regravam a sessão
+        with metricas.etapa('sessao'):
+            sessoes.salvar(sessao, estado, alterado=marca_sessao(estado) != marca)
 
-                elements = gerar_elementos_cytoscape(G)
-            else:
-                return elements, html.P("Erro: Nenhuma aresta selecionada.")
-
-            if G.number_of_edges() == 0:
-                orientado = False
-                ponderado = False
-
-        elif button_id == 'btn-add-weight':
-
-            if G.number_of_nodes() == 0:
-                return elements, html.P("Nenhum grafo carregado.") 
-
-            if selected_edges and add_edge_weight is not None:
-                weight = float(add_edge_weight)
-                if not ponderado:
-                    ponderado = True
-                    for edge in G.edges():
-                        G[edge[0]][edge[1]]['weight'] = 1.0
-                for edge_data in selected_edges:
-                    G[edge_data['source']][edge_data['target']]['weight'] = weight
-                elements = gerar_elementos_cytoscape(G)
+@app.callback(
+    [Output('cytoscape-grafo', 'elements'),
+     Output('grafo-info', 'children'),
+     Output('intervalo-tarefas', 'disabled'),
+     Output('versao-grafo', 'data'),
+     Output('resultado-algoritmo', 'data')],
+    Input('refresh-button', 'n_clicks'),
+    State('sessao', 'data'),
+)
+@instrumentar_callback
+def exibir_grafo(n_clicks, sessao):
+    # Carga da página e botão de atualizar: reenvia a lista completa
+    def exibir(estado):
+        if n_clicks is None:
+            estado.elementos.invalidar()
+            return elementos_para_cliente(estado), [html.P("Nenhum grafo carregado.")]
+        if estado.G.number_of_nodes() == 0:
+            return no_update, html.P("Nenhum grafo carregado.")
+
+        estado.expandidos.clear()  # No modo resumo, recolhe todos os grupos
+        estado.elementos.invalidar()
+        return elementos_para_cliente(estado), info_grafo(estado)
+
+    return executar_acao(sessao, 'refresh-button', exibir, requer_grafo=False)
+
+@app.callback(
+    SAIDAS_GRAFO,
+    Input('upload-data', 'contents'),
+    State('sessao', 'data'),
+    prevent_initial_call=True,
+)
+@instrumentar_callback
+def carregar_arquivo(contents, sessao):
+    def carregar(estado):
+        if contents is None:
+            return no_update, no_update
+
+        with metricas.etapa('leitura'):
+            content_type, content_string = contents.split(',')
+            decoded = base64.b64decode(content_string)
+
+            # Lê o conteúdo direto da memória, sem arquivo temporário
+            if eh_snapshot_bin(decoded):
+                G, _, _ = carregar_grafo_bin(decoded)
             else:
-                return elements, html.P("Erro: Nenhuma aresta selecionada ou peso não fornecido.")
+                G, _, _ = (carregar_grafo_csr if BACKEND_GRAFO == 'csr' else carregar_grafo_txt)(decoded)
+        estado.posicoes.limpar()  # Grafo novo: layout calculado do zero
+        estado.trocar_grafo(G)
+        return elementos_para_cliente(estado), info_grafo(estado)
 
-#------------------------------------------------------------------------------------------------#
-#-----------------------------------------INÍCIO BFS---------------------------------------------#
-#------------------------------------------------------------------------------------------------#
+    return executar_acao(sessao, 'upload-data', carregar, requer_grafo=False)
 
-        elif button_id == 'btn-bfs':
-            if G.number_of_nodes() == 0:
-                return elements, html.P("Nenhum grafo carregado.")
-
-            if selected_nodes is None or len(selected_nodes) != 1:
-                return elements, html.P("Erro: Selecione exatamente um nó para iniciar a busca BFS.")
-
-            start_node = selected_nodes[0]['id']
-            bfs_result = list(nx.bfs_edges(G, source=start_node))
-            bfs_nodes = set([start_node] + [node for edge in bfs_result for node in edge])  # Todos os nós visitados
-
-            elements = gerar_elementos_cytoscape(G)  # Atualiza elementos antes de colorir
-
-            # Reset de cores e classes de todos os elementos
-            for element in elements:
-                if 'data' in element:
-                    if 'source' in element['data'] and 'target' in element['data']:
-                        element['classes'] = ''  # Remove classes anteriores
-                    elif 'id' in element['data']:
-                        element['classes'] = ''  # Remove classes anteriores para nós
-
-            # Adiciona classes para nós e arestas visitados no BFS
-            for u, v in bfs_result:
-                for edge in elements:
-                    if 'data' in edge and 'source' in edge['data'] and 'target' in edge['data']:
-                        if (edge['data']['source'] == u and edge['data']['target'] == v) or \
-                        (not orientado and edge['data']['source'] == v and edge['data']['target'] == u):  # Grafo não orientado
-                            edge['classes'] = 'edge-bfs-visited'  # Aplica a classe CSS
-
-            for node in bfs_nodes:
-                for element in elements:
-                    if 'data' in element and 'id' in element['data'] and element['data']['id'] == node:
-                        element['classes'] = 'bfs-visited'  # Aplica a classe CSS para os nós
-            
-            adjacency_list = [
-                html.P(
-                    children=[
-                        html.B(sorted(node)),  # Vértice em negrito
-                        " -> ",
-                        ', '.join(map(str, sorted(neighbors)))  # Ordena os vizinhos em ordem crescente
-                    ],
-                    style={'margin': '0', 'padding': '0'}  # Remove margens e espaçamentos
-                ) for node, neighbors in nx.to_dict_of_lists(G).items()
-            ]
-
-            info = [
-                html.P(f"Número de Vértices: ", style={'display': 'inline'}),
-                html.B(f"{len(G.nodes)}", style={'display': 'inline'}),
-                html.Br(),
-                html.P(f"Número de Arestas: ", style={'display': 'inline'}),
-                html.B(f"{len(G.edges)}", style={'display': 'inline'}),
-                html.Br(),
-                html.P(f"Ponderado: ", style={'display': 'inline'}),
-                html.B(f"{'Sim' if ponderado else 'Não'}", style={'display': 'inline'}),
-                html.Br(),
-                html.P(f"Orientado: ", style={'display': 'inline'}),
-                html.B(f"{'Sim' if orientado else 'Não'}", style={'display': 'inline'}),
-                html.Br(),
-                html.Br(),
-                html.P(f"Lista de Adjacência: "),
-                *adjacency_list,  # Exibindo a lista de adjacência formatada
-                html.Br(),
-                html.P(f"Resultado BFS a partir do nó: ", style={'display': 'inline'}),
-                html.B(f"'{start_node}': {bfs_result}", style={'display': 'inline'}),
-            ] 
-            return elements, info
+@app.callback(
+    SAIDAS_GRAFO,
+    Input('btn-add-node', 'n_clicks'),
+    [State('add-node', 'value'),
+     State('sessao', 'data')],
+    prevent_initial_call=True,
+)
+@instrumentar_callback
+def adicionar_vertice(n_clicks, add_node, sessao):
+    def adicionar(estado):
+        # Verifica se o input não está vazio e se o vértice não existe
+        if not add_node or add_node in estado.G:
+            # Retorna uma mensagem de erro se o input estiver vazio ou o vértice já existir
+            return no_update, html.P(f"Erro: Vértice '{add_node}' já existe ou o campo está vazio.")
+        estado.adicionar_vertice(add_node)
+        return elementos_para_cliente(estado), info_grafo(estado)
+
+    return executar_acao(sessao, 'btn-add-node', adicionar, requer_grafo=False)
 
-#------------------------------------------------------------------------------------------------#
-#-----------------------------------------FIM BFS------------------------------------------------#
-#------------------------------------------------------------------------------------------------#
+@app.callback(
+    SAIDAS_GRAFO,
+    Input('btn-remove-node', 'n_clicks'),
+    [State('cytoscape-grafo', 'selectedNodeData'),
+     State('sessao', 'data')],
+    prevent_initial_call=True,
+)
+@instrumentar_callback
+def remover_vertices(n_clicks, selected_nodes, sessao):
+    def remover(estado):
+        if not selected_nodes:
+            return no_update, html.P("Erro: Nenhum vértice selecionado.")
+        for node_data in selected_nodes:
+            estado.remover_vertice(node_data['id'])
+        return elementos_para_cliente(estado), info_grafo(estado)
 
-#------------------------------------------------------------------------------------------------#
-#-----------------------------------------INÍCIO DFS---------------------------------------------#
-#------------------------------------------------------------------------------------------------#
+    return executar_acao(sessao, 'btn-remove-node', remover, requer_grafo=False)
+
+@app.callback(
+    SAIDAS_GRAFO,
+    Input('btn-add-edge', 'n_clicks'),
+    [State('cytoscape-grafo', 'selectedNodeData'),
+     State('sessao', 'data')],
+    prevent_initial_call=True,
+)
+@instrumentar_callback
+def adicionar_aresta(n_clicks, selected_nodes, sessao):
+    def adicionar(estado):
+        # Um nó selecionado cria um auto-loop; dois, a aresta entre eles
+        if selected_nodes and len(selected_nodes) in (1, 2):
+            source = selected_nodes[0]['id']
+            target = selected_nodes[-1]['id']
+            estado.adicionar_aresta(source, target, 1.0 if estado.ponderado else None)
+        return elementos_para_cliente(estado), info_grafo(estado)
+
+    return executar_acao(sessao, 'btn-add-edge', adicionar)
+
+@app.callback(
+    SAIDAS_GRAFO,
+    Input('btn-remove-edge', 'n_clicks'),
+    [State('cytoscape-grafo', 'selectedEdgeData'),
+     State('sessao', 'data')],
+    prevent_initial_call=True,
+)
+@instrumentar_callback
+def remover_arestas(n_clicks, selected_edges, sessao):
+    def remover(estado):
+        if not selected_edges:
+            return no_update, html.P("Erro: Nenhuma aresta selecionada.")
+        for edge_data in selected_edges:
+            source = edge_data['source']
+            target = edge_data['target']
+            if estado.G.has_edge(source, target):
+                estado.remover_aresta(source, target)
+        return elementos_para_cliente(estado), info_grafo(estado)
+
+    return executar_acao(sessao, 'btn-remove-edge', remover)
+
+@app.callback(
+    SAIDAS_GRAFO,
+    Input('btn-add-weight', 'n_clicks'),
+    [State('cytoscape-grafo', 'selectedEdgeData'),
+     State('add-edge-weight', 'value'),
+     State('sessao', 'data')],
+    prevent_initial_call=True,
+)
+@instrumentar_callback
+def definir_peso(n_clicks, selected_edges, add_edge_weight, sessao):
+    def definir(estado):
+        if not selected_edges or add_edge_weight is None:
+            return no_update, html.P("Erro: Nenhuma aresta selecionada ou peso não fornecido.")
+        weight = float(add_edge_weight)
+        if not estado.ponderado:
+            estado.tornar_ponderado()
+        for edge_data in selected_edges:
+            estado.definir_peso(edge_data['source'], edge_data['target'], weight)
+        return elementos_para_cliente(estado), info_grafo(estado)
+
+    return executar_acao(sessao, 'btn-add-weight', definir)
 
-        elif button_id == 'btn-dfs':
-            if G.number_of_nodes() == 0:
-                return elements, html.P("Nenhum grafo carregado.")
-
-            if selected_nodes is None or len(selected_nodes) != 1:
-                return elements, html.P("Erro: Selecione exatamente um nó para iniciar a busca DFS.")
-
-            start_node = selected_nodes[0]['id']
-            dfs_result = list(nx.dfs_edges(G, source=start_node))
-            dfs_nodes = set([start_node] + [node for edge in dfs_result for node in edge])  # Todos os nós visitados
-
-            elements = gerar_elementos_cytoscape(G)  # Atualiza elementos antes de colorir
-
-            # Reset de cores e classes de todos os elementos
-            for element in elements:
-                if 'data' in element:
-                    if 'source' in element['data'] and 'target' in element['data']:
-                        element['classes'] = ''  # Remove classes anteriores
-                    elif 'id' in element['data']:
-                        element['classes'] = ''  # Remove classes anteriores para nós
-
-            # Adiciona classes para nós e arestas visitados no DFS
-            for u, v in dfs_result:
-                for edge in elements:
-                    if 'data' in edge and 'source' in edge['data'] and 'target' in edge['data']:
-                        if (edge['data']['source'] == u and edge['data']['target'] == v) or \
-                        (not orientado and edge['data']['source'] == v and edge['data']['target'] == u):  # Grafo não orientado
-                            edge['classes'] = 'edge-dfs-visited'  # Aplica a classe CSS
-
-            for node in dfs_nodes:
-                for element in elements:
-                    if 'data' in element and 'id' in element['data'] and element['data']['id'] == node:
-                        element['classes'] = 'dfs-visited'  # Aplica a classe CSS para os nós
-
-            adjacency_list = [
-                html.P(
-                    children=[
-                        html.B(sorted(node)),  # Vértice em negrito
-                        " -> ",
-                        ', '.join(map(str, sorted(neighbors)))  # Ordena os vizinhos em ordem crescente
-                    ],
-                    style={'margin': '0', 'padding': '0'}  # Remove margens e espaçamentos
-                ) for node, neighbors in nx.to_dict_of_lists(G).items()
-            ]
-
-            info = [
-                html.P(f"Número de Vértices: ", style={'display': 'inline'}),
-                html.B(f"{len(G.nodes)}", style={'display': 'inline'}),
-                html.Br(),
-                html.P(f"Número de Arestas: ", style={'display': 'inline'}),
-                html.B(f"{len(G.edges)}", style={'display': 'inline'}),
-                html.Br(),
-                html.P(f"Ponderado: ", style={'display': 'inline'}),
-                html.B(f"{'Sim' if ponderado else 'Não'}", style={'display': 'inline'}),
-                html.Br(),
-                html.P(f"Orientado: ", style={'display': 'inline'}),
-                html.B(f"{'Sim' if orientado else 'Não'}", style={'display': 'inline'}),
-                html.Br(),
-                html.Br(),
-                html.P(f"Lista de Adjacência: "),
-                *adjacency_list,  # Exibindo a lista de adjacência formatada
-                html.Br(),
-                html.P(f"Resultado DFS a partir do nó: ", style={'display': 'inline'}),
-                html.B(f"'{start_node}': {dfs_result}", style={'display': 'inline'}),
-            ] 
-            return elements, info
 #------------------------------------------------------------------------------------------------#
-#-----------------------------------------FIM DFS------------------------------------------------#
+#--------------------------------------------BFS/DFS---------------------------------------------#
 #------------------------------------------------------------------------------------------------#
 
+@app.callback(
+    SAIDAS_GRAFO,
+    [Input('btn-bfs', 'n_clicks'),
+     Input('btn-dfs', 'n_clicks')],
+    [State('cytoscape-grafo', 'selectedNodeData'),
+     State('sessao', 'data')],
+    prevent_initial_call=True,
+)
+@instrumentar_callback
+def executar_busca(bfs_clicks, dfs_clicks, selected_nodes, sessao):
+    acao = callback_context.triggered_id
+    algoritmo = 'bfs' if acao == 'btn-bfs' else 'dfs'
+
+    def buscar(estado):
+        if selected_nodes is None or len(selected_nodes) != 1:
+            return no_update, html.P(f"Erro: Selecione exatamente um nó para iniciar a busca {algoritmo.upper()}.")
+
+        start_node = selected_nodes[0]['id']
+        # Repetir a busca a partir do mesmo nó usa o resultado memorizado
+        calculado = estado.chave_resultado(algoritmo, start_node) in estado.resultados
+        if not calculado and estado.num_arestas > LIMITE_SEGUNDO_PLANO:
+            return submeter_tarefa(estado, algoritmo, executar_bfs if algoritmo == 'bfs' else executar_dfs, start_node)
+
+        busca = bfs_arestas if algoritmo == 'bfs' else dfs_arestas
+        with metricas.etapa('algoritmo', algoritmo=algoritmo):
+            resultado = estado.memorizar(algoritmo, lambda: busca(estado.G, start_node), start_node)
+        destaque, info = renderizar_percurso(estado, algoritmo, start_node, resultado)
+        return no_update, info, destaque
+
+    return executar_acao(sessao, acao, buscar)
+
 #------------------------------------------------------------------------------------------------#
-#-----------------------------------------INÍCIO SCC---------------------------------------------#
+#-----------------------------------------------SCC----------------------------------------------#
 #------------------------------------------------------------------------------------------------#
 
-        elif button_id == 'btn-scc':
-            
-            # Verifica se o grafo não é orientado.
-            if orientado == False:
-                return elements, html.P("Erro: O grafo deve ser orientado para prosseguir.")
-            #VAI CORITNHIANS
-
-            #  NAO ESCUTEM A MUSICA TREPADA EM CUIABÁ
-
-            # Verifica se o grafo está vazio (sem nós).
-            if G.number_of_nodes() == 0:
-                return elements, html.P("Nenhum grafo carregado.")
-        
-
-            #lista de cores para diferenciar as SCCs visualmente.
-            cores = ["#FFA500", "#FFC0CB", "#FFFF00", "#00FFFF", "#0000FF", "#FF1493", "#FF00FF", "#FF6347"]
-
-            index = 0  # Usada para atribuir um índice a cada nó.
-            stack = []  # Pilha usada para armazenar os nós enquanto estão sendo processados.
-            indexes = {}  # Mantém o índice de descoberta de cada nó.
-            lowlink = {}  # Mantém o menor índice alcançável a partir de cada nó.
-            on_stack = {}  # Verificar se um nó está na pilha 'stack'.
-            sccs = []  # Armazenar componentes fortemente conexas (SCCs).
-
-            # Função de Tarjan que realiza a busca em profundidade para encontrar as SCCs.
-            def tarjan(v):
-                # A variável 'index' é compartilhada entre a função e o escopo externo.
-                nonlocal index
-                
-                indexes[v] = index  # Atribui o índice de descoberta ao nó 'v'.
-                lowlink[v] = index  # Inicializa o 'lowlink' do nó 'v' com o valor do índice de descoberta.
-                index += 1  # Incrementa o índice para o próximo nó.
-                
-                stack.append(v)  # Adiciona o nó 'v' à pilha de exploração.
-                on_stack[v] = True  # Marca o nó 'v' como estando na pilha.
-                
-                # Itera sobre todos os sucessores (vizinhos) do nó 'v'.
-                for w in G.successors(v):
-                    if w not in indexes:  # Se o nó 'w' ainda não foi visitado...
-                        tarjan(w)  # Faz uma chamada recursiva para processar o nó 'w'.
-                        # Após o processamento recursivo, atualiza o 'lowlink' do nó 'v' com o menor 'lowlink' encontrado.
-                        lowlink[v] = min(lowlink[v], lowlink[w])
-                    elif on_stack[w]:  # Se o nó 'w' está na pilha (parte do ciclo atual)...
-                        # Atualiza o 'lowlink' do nó 'v' com o índice de 'w' (que faz parte da mesma SCC).
-                        lowlink[v] = min(lowlink[v], indexes[w])
-
-                # Verifica se o nó 'v' é a raiz de uma nova SCC.
-                if lowlink[v] == indexes[v]:
-                    scc = []  # Lista para armazenar os nós da SCC encontrada.
-                    while True:
-                        w = stack.pop()  # Desempilha um nó da pilha.
-                        on_stack[w] = False  # Marca o nó como não estando mais na pilha.
-                        scc.append(w)  # Adiciona o nó 'w' à SCC.
-                        if w == v:  # Quando o nó 'v' for desempilhado, termina o processo de formação da SCC.
-                            break
-                    sccs.append(scc)  # Adiciona a SCC encontrada à lista de SCCs.
-
-            # Executa o algoritmo de Tarjan para cada nó do grafo.
-            for node in G.nodes():
-                if node not in indexes:  # Se o nó ainda não foi visitado (não tem índice atribuído)...
-                    tarjan(node)  # Chama a função tarjan para processar o nó 'node'.
-
-            # Atualiza os elementos adicionando classes para nós e arestas das SCCs
-            for idx, scc in enumerate(sccs):
-                scc_class = f"scc-{idx}"  # Classe única para cada SCC
-                cor = cores[idx % len(cores)]  # Seleciona uma cor da lista de forma cíclica
-
-                # Aplica a classe de SCC para os nós
-                for node in scc:
-                    for element in elements:
-                        if 'data' in element and 'id' in element['data'] and element['data']['id'] == node:
-                            element['classes'] = scc_class
-
-                # Aplica a classe de SCC para as arestas que conectam nós dentro da SCC
-                for u in scc:
-                    for v in scc:
-                        if G.has_edge(u, v):  # Verifica se a aresta existe entre u e v
-                            for edge in elements:
-                                if 'data' in edge and 'source' in edge['data'] and 'target' in edge['data']:
-                                    if edge['data']['source'] == u and edge['data']['target'] == v:
-                                        edge['classes'] = scc_class
-
-            # Exibe as SCCs no layout
-            scc_info = [
-                item
-                for idx, scc in enumerate(sccs)
-                for item in (
-                    html.P(f"Componente Fortemente Conexa {idx + 1}: ", style={'display': 'inline'}),
-                    html.B(f"{', '.join(map(str, sorted(scc)))}"),
-                    html.Br()
-                )
-            ]
-
-            adjacency_list = [
-                html.P(
-                    children=[
-                        html.B(sorted(node)),  # Vértice em negrito
-                        " -> ",
-                        ', '.join(map(str, sorted(neighbors)))  # Ordena os vizinhos em ordem crescente
-                    ],
-                    style={'margin': '0', 'padding': '0'}  # Remove margens e espaçamentos
-                ) for node, neighbors in nx.to_dict_of_lists(G).items()
-            ]
-
-            info = [
-                html.P(f"Número de Vértices: ", style={'display': 'inline'}),
-                html.B(f"{len(G.nodes)}", style={'display': 'inline'}),
-                html.Br(),
-                html.P(f"Número de Arestas: ", style={'display': 'inline'}),
-                html.B(f"{len(G.edges)}", style={'display': 'inline'}),
-                html.Br(),
-                html.P(f"Ponderado: ", style={'display': 'inline'}),
-                html.B(f"{'Sim' if ponderado else 'Não'}", style={'display': 'inline'}),
-                html.Br(),
-                html.P(f"Orientado: ", style={'display': 'inline'}),
-                html.B(f"{'Sim' if orientado else 'Não'}", style={'display': 'inline'}),
-                html.Br(),
-                html.Br(),
-                html.P(f"Lista de Adjacência: "),
-                *adjacency_list,  # Exibindo a lista de adjacência formatada
-                html.Br(),
-                *scc_info,
-            ]
-            
-            return elements, info
+@app.callback(
+    SAIDAS_GRAFO,
+    Input('btn-scc', 'n_clicks'),
+    State('sessao', 'data'),
+    prevent_initial_call=True,
+)
+@instrumentar_callback
+def executar_componentes(n_clicks, sessao):
+    def componentes(estado):
+        # Verifica se o grafo não é orientado.
+        if not estado.orientado:
+            return no_update, html.P("Erro: O grafo deve ser orientado para prosseguir.")
+
+        # Com as componentes já mantidas incrementalmente, a consulta é barata
+        calculado = estado.chave_resultado('scc') in estado.resultados or estado.scc.ativo
+        if not calculado and estado.num_arestas > LIMITE_SEGUNDO_PLANO:
+            return submeter_tarefa(estado, 'scc', executar_scc)
+
+        # Tarjan iterativo (módulo scc): não depende do limite de recursão
+        with metricas.etapa('algoritmo', algoritmo='scc'):
+            rotulos, componente = estado.memorizar('scc', lambda: estado.scc.componentes(estado.G))
+        destaque, info = renderizar_scc(estado, rotulos, componente)
+        return no_update, info, destaque
+
+    return executar_acao(sessao, 'btn-scc', componentes)
+
+# Aplica as classes do resultado sobre os elementos que o navegador já tem
+app.clientside_callback(
+    ClientsideFunction(namespace='grafo', function_name='destacar'),
+    Output('cytoscape-grafo', 'elements', allow_duplicate=True),
+    Input('resultado-algoritmo', 'data'),
+    State('cytoscape-grafo', 'elements'),
+    prevent_initial_call=True,
+)
+
+app.clientside_callback(
+    ClientsideFunction(namespace='grafo', function_name='texto'),
+    Output('resultado-texto', 'children'),
+    Input('resultado-algoritmo', 'data'),
+)
 
 #------------------------------------------------------------------------------------------------#
-#-----------------------------------------FIM SCC------------------------------------------------#
+#------------------------------------ORIENTAÇÃO E PESOS------------------------------------------#
 #------------------------------------------------------------------------------------------------#
-        
-        elif button_id == 'btn-to-directed':
-            if G.number_of_nodes() == 0:
-                return elements, html.P("Nenhum grafo carregado.")
-
-            if len(G.edges) <= 0:
-                return elements, html.P("Erro: Número de arestas insuficiente para converter.")
-
-            if G.is_directed():
-                return elements, html.P("O grafo já é orientado.")
-            
-            G_dir = nx.DiGraph()
-            G_dir.add_nodes_from(G.nodes(data=True))  # Preserva os nós
-            G_dir.add_edges_from(original_edges)  # Restaura as arestas originais
-            
-            G = G_dir
-            orientado = True
-            elements = gerar_elementos_cytoscape(G)
-
-        elif button_id == 'btn-to-undirected':
-            if G.number_of_nodes() == 0:
-                return elements, html.P("Nenhum grafo carregado.")
-
-            if G.is_directed():
-                original_edges = list(G.edges(data=True))  # Armazena as arestas originais com dados
-                G = nx.Graph(G)  
-                orientado = False
-                elements = gerar_elementos_cytoscape(G)
-            else:
-                return elements, html.P("O grafo já é não-orientado.")
-
-        elif button_id == 'btn-make-weighted':
-            if G.number_of_nodes() == 0:
-                return elements, html.P("Nenhum grafo carregado.")
-
-            if ponderado:
-                return elements, html.P("O grafo já é ponderado.")
-
-            # Adiciona peso padrão de 1.0 onde não houver, utilizando a variável original_edges para armazená-los
-            for u, v in G.edges():
-                G[u][v]['weight'] = G[u][v].get('weight', 1.0)
-
-            # Atualiza original_edges com pesos das arestas
-            original_edges = [
-                (u, v, {'weight': G[u][v]['weight']}) for u, v in G.edges()
-            ]
-
-            ponderado = True
-            elements = gerar_elementos_cytoscape(G)
-
-        elif button_id == 'btn-make-unweighted':
-            if G.number_of_nodes() == 0:
-                return elements, html.P("Nenhum grafo carregado.")
-
-            if not ponderado:
-                return elements, html.P("O grafo já é não-ponderado.")
-
-            # Remove o peso das arestas no grafo e de original_edges
-            for u, v in G.edges():
-                G[u][v].pop('weight', None)
-
-            # Atualiza original_edges para remover pesos
-            original_edges = [
-                (u, v) for u, v, data in original_edges
-            ]
-
-            ponderado = False
-            elements = gerar_elementos_cytoscape(G)
-
-        elif button_id == 'delete-button':
-            if G.number_of_nodes() == 0:
-                return elements, html.P("Nenhum grafo carregado.")
-            
-            # Remover todos os vértices do grafo
-            G.clear()  # O método clear() apaga todos os nós e arestas
-
-            # Gerar os elementos para o Cytoscape após a remoção dos vértices
-            elements = gerar_elementos_cytoscape(G)
-            
-            return elements, html.P("Nenhum grafo carregado.")
-
-        elif button_id == 'refresh-button':
-            if G.number_of_nodes() == 0:
-                return elements, html.P("Nenhum grafo carregado.")
-    
-            elements = gerar_elementos_cytoscape(G)
-
-        adjacency_list = [
-            html.P(
-                children=[
-                    html.B(sorted(node)),  # Vértice em negrito
-                    " -> ",
-                    ', '.join(map(str, sorted(neighbors)))  # Ordena os vizinhos em ordem crescente
-                ],
-                style={'margin': '0', 'padding': '0'}  # Remove margens e espaçamentos
-            ) for node, neighbors in nx.to_dict_of_lists(G).items()
-        ]
-
-        info = [
-            html.P(f"Número de Vértices: ", style={'display': 'inline'}),
-            html.B(f"{len(G.nodes)}", style={'display': 'inline'}),
-            html.Br(),
-            html.P(f"Número de Arestas: ", style={'display': 'inline'}),
-            html.B(f"{len(G.edges)}", style={'display': 'inline'}),
-            html.Br(),
-            html.P(f"Ponderado: ", style={'display': 'inline'}),
-            html.B(f"{'Sim' if ponderado else 'Não'}", style={'display': 'inline'}),
-            html.Br(),
-            html.P(f"Orientado: ", style={'display': 'inline'}),
-            html.B(f"{'Sim' if orientado else 'Não'}", style={'display': 'inline'}),
-            html.Br(),
-            html.Br(),
-            html.P(f"Lista de Adjacência: "),
-            *adjacency_list,  # Exibindo a lista de adjacência formatada
-        ]
-        
-        return elements, info
-    
-    except Exception as e:
-        return elements, html.P(f"Erro: {str(e)}")
+
+@app.callback(
+    SAIDAS_GRAFO,
+    [Input('btn-to-directed', 'n_clicks'),
+     Input('btn-to-undirected', 'n_clicks')],
+    State('sessao', 'data'),
+    prevent_initial_call=True,
+)
+@instrumentar_callback
+def alterar_orientacao(to_directed_clicks, to_undirected_clicks, sessao):
+    acao = callback_context.triggered_id
+
+    def alterar(estado):
+        if acao == 'btn-to-directed':
+            if estado.G.number_of_edges() <= 0:
+                return no_update, html.P("Erro: Número de arestas insuficiente para converter.")
+            if estado.orientado:
+                return no_update, html.P("O grafo já é orientado.")
+            # Volta ao armazém orientado, que guarda a orientação original das arestas
+            estado.definir_orientacao(True)
+        else:
+            if not estado.orientado:
+                return no_update, html.P("O grafo já é não-orientado.")
+            # Vista não orientada sobre o mesmo armazém, sem copiar o grafo
+            estado.definir_orientacao(False)
+        return elementos_para_cliente(estado), info_grafo(estado)
+
+    return executar_acao(sessao, acao, alterar)
+
+@app.callback(
+    SAIDAS_GRAFO,
+    [Input('btn-make-weighted', 'n_clicks'),
+     Input('btn-make-unweighted', 'n_clicks')],
+    State('sessao', 'data'),
+    prevent_initial_call=True,
+)
+@instrumentar_callback
+def alterar_ponderacao(make_weighted_clicks, make_unweighted_clicks, sessao):
+    acao = callback_context.triggered_id
+
+    def alterar(estado):
+        if acao == 'btn-make-weighted':
+            if estado.ponderado:
+                return no_update, html.P("O grafo já é ponderado.")
+            # Adiciona peso padrão de 1.0 onde não houver, nos dois sentidos das arestas
+            estado.tornar_ponderado()
+        else:
+            if not estado.ponderado:
+                return no_update, html.P("O grafo já é não-ponderado.")
+            # Remove o peso de todas as arestas do grafo
+            estado.remover_pesos()
+        return elementos_para_cliente(estado), info_grafo(estado)
+
+    return executar_acao(sessao, acao, alterar)
+
+@app.callback(
+    SAIDAS_GRAFO,
+    Input('delete-button', 'n_clicks'),
+    State('sessao', 'data'),
+    prevent_initial_call=True,
+)
+@instrumentar_callback
+def apagar_grafo(n_clicks, sessao):
+    def apagar(estado):
+        estado.limpar()  # Apaga todos os nós e arestas
+        return elementos_para_cliente(estado), html.P("Nenhum grafo carregado.")
+
+    return executar_acao(sessao, 'delete-button', apagar)
 
 if __name__ == '__main__':
     app.run_server(debug=True, port=8053)
\ No newline at end of file
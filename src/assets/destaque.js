@@ -0,0 +1,175 @@
+// Callbacks executados no navegador (clientside_callback): zoom, destaque e
+// texto dos resultados dos algoritmos, e o filtro dos toques em super-nós. O
+// servidor envia só os vetores compactos gerados em destaque.py, e as classes
+// são aplicadas aqui sobre os elementos que o Cytoscape já tem.
+
+// Itens (arestas ou vértices) listados no texto do resultado; o destaque no grafo é sempre completo
+const LIMITE_TEXTO_RESULTADO = 2000;
+
+// Vetor int32 little-endian em base64 (destaque.vetor_int32)
+function vetorInt32(base64) {
+    const binario = atob(base64);
+    const bytes = new Uint8Array(binario.length);
+    for (let i = 0; i < binario.length; i++) {
+        bytes[i] = binario.charCodeAt(i);
+    }
+    return new Int32Array(bytes.buffer);
+}
+
+// Percorre as componentes codificadas por carreiras: funcao(c, inicio, fim) com nos[inicio:fim] na componente c
+function carreiras(resultado, funcao) {
+    const tamanhos = vetorInt32(resultado.tamanhos);
+    let inicio = 0;
+    for (let c = 0; c < tamanhos.length; c++) {
+        funcao(c, inicio, inicio + tamanhos[c]);
+        inicio += tamanhos[c];
+    }
+}
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    grafo: {
+        zoom: function (nInicial, nFinal, zoom) {
+            const triggered = window.dash_clientside.callback_context.triggered;
+            if (!triggered.length) {
+                return window.dash_clientside.no_update;
+            }
+            const botao = triggered[0].prop_id.split('.')[0];
+            const passo = botao === 'zoom-in' ? 0.5 : -0.5;
+            // Mesmos limites de minZoom/maxZoom do Cytoscape
+            return Math.max(1.0, Math.min((zoom || 2.0) + passo, 2.5));
+        },
+
+        grupo: function (nodeData) {
+            // Toques em vértices comuns não fazem uma requisição ao servidor
+            if (!nodeData || nodeData.representante === undefined) {
+                return window.dash_clientside.no_update;
+            }
+            return nodeData;
+        },
+
+        destacar: function (resultado, elements) {
+            if (!resultado || !elements) {
+                return window.dash_clientside.no_update;
+            }
+
+            // id do nó -> índice, e "source\u0000target" da aresta -> índice
+            const nos = new Map();
+            const arestas = new Map();
+            elements.forEach(function (element, i) {
+                const data = element.data || {};
+                if (data.source !== undefined) {
+                    arestas.set(data.source + '\u0000' + data.target, i);
+                } else {
+                    nos.set(data.id, i);
+                }
+            });
+
+            // Copia os elementos, voltando às classes base de graph_logic/resumo
+            const novos = elements.map(function (element) {
+                const data = element.data || {};
+                const classe = data.source !== undefined ? 'edge'
+                    : (data.representante !== undefined ? 'grupo' : 'node');
+                return Object.assign({}, element, {classes: classe});
+            });
+
+            function aresta(u, v) {
+                let i = arestas.get(u + '\u0000' + v);
+                if (i === undefined && !resultado.orientado) {
+                    // Grafo não orientado: a aresta pode estar guardada no sentido inverso
+                    i = arestas.get(v + '\u0000' + u);
+                }
+                return i;
+            }
+
+            if (resultado.algoritmo === 'scc') {
+                // Cada nó recebe a classe da sua componente; a aresta só é
+                // colorida quando as duas pontas estão na mesma componente
+                const componente = new Map();
+                carreiras(resultado, function (c, inicio, fim) {
+                    for (let k = inicio; k < fim; k++) {
+                        componente.set(resultado.nos[k], c);
+                    }
+                });
+                novos.forEach(function (element) {
+                    const data = element.data || {};
+                    if (data.source !== undefined) {
+                        const c = componente.get(data.source);
+                        if (c !== undefined && c === componente.get(data.target)) {
+                            element.classes = 'scc-' + c;
+                        }
+                    } else if (componente.has(data.id)) {
+                        element.classes = 'scc-' + componente.get(data.id);
+                    }
+                });
+                return novos;
+            }
+
+            // BFS/DFS: a aresta que descobriu nos[k] parte de nos[pais[k]]
+            const classeNo = resultado.algoritmo + '-visited';
+            const classeAresta = 'edge-' + resultado.algoritmo + '-visited';
+            const pais = vetorInt32(resultado.pais);
+            pais.forEach(function (pai, k) {
+                if (pai >= 0) {
+                    const i = aresta(resultado.nos[pai], resultado.nos[k]);
+                    if (i !== undefined) {
+                        novos[i].classes = classeAresta;
+                    }
+                }
+            });
+            resultado.nos.forEach(function (id) {
+                const i = nos.get(id);
+                if (i !== undefined) {
+                    novos[i].classes = classeNo;
+                }
+            });
+            return novos;
+        },
+
+        texto: function (resultado) {
+            // Um único nó de texto, em vez de um componente por item do resultado
+            if (!resultado) {
+                return '';
+            }
+            const linhas = [];
+
+            if (resultado.algoritmo === 'scc') {
+                let itens = 0;
+                let omitidas = 0;
+                carreiras(resultado, function (c, inicio, fim) {
+                    if (fim === inicio) {
+                        return;  // Componente sem vértice visível (modo resumo)
+                    }
+                    if (itens >= LIMITE_TEXTO_RESULTADO) {
+                        omitidas++;
+                        return;
+                    }
+                    const nomes = resultado.nos.slice(inicio, Math.min(fim, inicio + LIMITE_TEXTO_RESULTADO - itens));
+                    itens += nomes.length;
+                    const resto = fim - inicio - nomes.length;
+                    linhas.push('Componente Fortemente Conexa ' + (c + 1) + ': ' + nomes.join(', ')
+                        + (resto > 0 ? ' … (+' + resto + ')' : ''));
+                });
+                if (omitidas > 0) {
+                    linhas.push('… e mais ' + omitidas + ' componentes.');
+                }
+                if (resultado.parcial) {
+                    linhas.push('(Modo resumo: apenas os vértices exibidos.)');
+                }
+                return linhas.join('\n');
+            }
+
+            const pais = vetorInt32(resultado.pais);
+            const pares = [];
+            for (let k = 0; k < pais.length && pares.length < LIMITE_TEXTO_RESULTADO; k++) {
+                if (pais[k] >= 0) {
+                    pares.push('(' + resultado.nos[pais[k]] + ', ' + resultado.nos[k] + ')');
+                }
+            }
+            const resto = Math.max(resultado.total - 1 - pares.length, 0);
+            linhas.push('Resultado ' + resultado.algoritmo.toUpperCase() + ' a partir do nó \''
+                + resultado.origem + '\' (' + resultado.total + ' vértices visitados): '
+                + '[' + pares.join(', ') + (resto > 0 ? ', … (+' + resto + ')' : '') + ']');
+            return linhas.join('\n');
+        },
+    },
+});
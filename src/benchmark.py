@@ -0,0 +1,252 @@
+"""Benchmarks do carregamento, da gravação, dos elementos do Cytoscape e dos
+callbacks de BFS/DFS/SCC, sobre grafos sintéticos.
+
+Uso (a partir de src/):
+
+    python benchmark.py --tamanhos 1000 100000 --saida resultados.json
+    python benchmark.py --saida novo.json --comparar resultados.json
+
+Para cada gerador, tamanho (número de arestas) e operação são medidos o
+tempo (o menor entre as repetições), o pico de memória alocada (tracemalloc)
+e o tamanho do que seria enviado ao navegador ou gravado em disco.
+"""
+
+import argparse
+import gc
+import io
+import json
+import platform
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+from plotly.utils import PlotlyJSONEncoder
+
+from graph_logic import (
+    ArestasNumpy, CacheResultados, EstadoGrafo, carregar_grafo_txt, carregar_grafo_csr,
+    salvar_grafo_txt, gerar_elementos_cytoscape, bfs_arestas, dfs_arestas,
+)
+from grafo_csr import GrafoCSR
+
+# Acima deste número de arestas as operações que criam um objeto Python por
+# vértice ou aresta (NetworkX, elementos do Cytoscape) são puladas
+LIMITE_OBJETOS = 2_000_000
+
+#####################################################
+############### GERADORES SINTÉTICOS ################
+#####################################################
+
+def _arestas(n, origem, destino):
+    rotulos = np.array([str(i) for i in range(n)], dtype=object)
+    return ArestasNumpy(rotulos, origem.astype(np.int64), destino.astype(np.int64),
+                        np.full(origem.size, np.nan))
+
+
+def erdos_renyi(m, rng):
+    # Grafo aleatório G(n, m) com grau médio 4
+    n = max(m // 4, 2)
+    return _arestas(n, rng.integers(0, n, m), rng.integers(0, n, m))
+
+
+def lei_de_potencia(m, rng, expoente=2.1):
+    # Modelo de Chung-Lu: graus esperados seguindo uma lei de potência
+    n = max(m // 4, 2)
+    pesos = np.arange(1, n + 1, dtype=np.float64) ** (-1.0 / (expoente - 1))
+    pesos /= pesos.sum()
+    return _arestas(n, rng.choice(n, m, p=pesos), rng.choice(n, m, p=pesos))
+
+
+def cadeia(m, rng):
+    # Caminho longo: pior caso para recursão e para a profundidade da DFS
+    origem = np.arange(m)
+    return _arestas(m + 1, origem, origem + 1)
+
+
+def grade(m, rng):
+    # Grade lado x lado com arestas para a direita e para baixo
+    lado = max(int(np.sqrt(m / 2)), 2)
+    ids = np.arange(lado * lado).reshape(lado, lado)
+    origem = np.concatenate([ids[:, :-1].ravel(), ids[:-1, :].ravel()])
+    destino = np.concatenate([ids[:, 1:].ravel(), ids[1:, :].ravel()])
+    return _arestas(lado * lado, origem, destino)
+
+
+def sccs_densas(m, rng, tamanho=50):
+    # Blocos de 'tamanho' vértices, cada um um ciclo com cordas aleatórias,
+    # ligados entre si sem formar ciclos (condensação acíclica)
+    blocos = max(m // (tamanho * 4), 1)
+    n = blocos * tamanho
+    base = np.repeat(np.arange(blocos) * tamanho, tamanho)
+    local = np.tile(np.arange(tamanho), blocos)
+    origem = [base + local, None, None]
+    destino = [base + (local + 1) % tamanho, None, None]
+
+    cordas = max(m - n - blocos, 0)
+    bloco = rng.integers(0, blocos, cordas) * tamanho
+    origem[1], destino[1] = bloco + rng.integers(0, tamanho, cordas), bloco + rng.integers(0, tamanho, cordas)
+
+    de = rng.integers(0, blocos, blocos)
+    para = np.minimum(de + 1 + rng.integers(0, 3, blocos), blocos - 1)
+    ligacoes = de < para
+    origem[2] = de[ligacoes] * tamanho
+    destino[2] = para[ligacoes] * tamanho
+    return _arestas(n, np.concatenate(origem), np.concatenate(destino))
+
+
+GERADORES = {
+    'erdos_renyi': erdos_renyi,
+    'lei_de_potencia': lei_de_potencia,
+    'cadeia': cadeia,
+    'grade': grade,
+    'sccs_densas': sccs_densas,
+}
+
+#####################################################
+##################### MEDIÇÃO #######################
+#####################################################
+
+def tamanho_payload(obj):
+    # Bytes do JSON enviado ao navegador (mesmo codificador usado pelo Dash)
+    if isinstance(obj, (bytes, bytearray)):
+        return len(obj)
+    return len(json.dumps(obj, cls=PlotlyJSONEncoder).encode())
+
+
+def medir(funcao, repeticoes, memoria=True):
+    tempos = []
+    for _ in range(repeticoes):
+        gc.collect()
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+        if len(tempos) < repeticoes:
+            del resultado
+
+    pico = None
+    if memoria:
+        # Execução separada: o tracemalloc deixa o código bem mais lento
+        gc.collect()
+        tracemalloc.start()
+        funcao()
+        pico = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return min(tempos), pico, resultado
+
+
+def _callback_algoritmo(app, G, algoritmo):
+    # Corpo dos callbacks de BFS/DFS/SCC, com o resultado memorizado
+    # descartado a cada execução para medir o cálculo completo
+    estado = EstadoGrafo(G)
+    inicio = next(iter(G.nodes()))
+
+    def executar():
+        estado.resultados = CacheResultados()
+        estado.scc.invalidar()
+        if algoritmo == 'scc':
+            rotulos, componente = estado.memorizar('scc', lambda: estado.scc.componentes(estado.G))
+            return app.renderizar_scc(estado, rotulos, componente)
+        busca = bfs_arestas if algoritmo == 'bfs' else dfs_arestas
+        return app.renderizar_percurso(estado, algoritmo, inicio, busca(estado.G, inicio))
+
+    return executar
+
+
+def executar_caso(nome, m, repeticoes, memoria, limite_objetos, semente=0):
+    arestas = GERADORES[nome](m, np.random.default_rng(semente))
+    csr = GrafoCSR.de_arestas(arestas)
+    buffer = io.BytesIO()
+    salvar_grafo_txt(csr, buffer)
+    texto = buffer.getvalue()
+
+    operacoes = [
+        ('carregar_grafo_csr', lambda: carregar_grafo_csr(texto)[0], False),
+        ('salvar_grafo_txt_csr', lambda: _salvar(csr), True),
+    ]
+    if csr.number_of_edges() <= limite_objetos:
+        import app  # Só importa o Dash quando os callbacks são medidos
+        G = carregar_grafo_txt(texto)[0]
+        operacoes += [
+            ('carregar_grafo_txt', lambda: carregar_grafo_txt(texto)[0], False),
+            ('salvar_grafo_txt', lambda: _salvar(G), True),
+            ('gerar_elementos_cytoscape', lambda: gerar_elementos_cytoscape(G), True),
+            ('callback_bfs', _callback_algoritmo(app, G, 'bfs'), True),
+            ('callback_dfs', _callback_algoritmo(app, G, 'dfs'), True),
+            ('callback_scc', _callback_algoritmo(app, G, 'scc'), True),
+        ]
+
+    resultados = []
+    for operacao, funcao, com_payload in operacoes:
+        tempo, pico, resultado = medir(funcao, repeticoes, memoria)
+        resultados.append({
+            'gerador': nome,
+            'vertices': csr.number_of_nodes(),
+            'arestas': csr.number_of_edges(),
+            'operacao': operacao,
+            'tempo_s': tempo,
+            'pico_memoria_bytes': pico,
+            'payload_bytes': tamanho_payload(resultado) if com_payload else None,
+        })
+        print(f"{nome:>16} {csr.number_of_edges():>10} {operacao:>26} {tempo:10.4f}s"
+              + (f" {pico / 2**20:10.1f} MiB" if pico is not None else ""), flush=True)
+    return resultados
+
+
+def _salvar(G):
+    buffer = io.BytesIO()
+    salvar_grafo_txt(G, buffer)
+    return buffer.getvalue()
+
+
+def _commit_atual():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparar(atuais, arquivo_base):
+    # Razão entre o tempo atual e o da execução de referência (> 1 é regressão)
+    with open(arquivo_base) as f:
+        base = {(r['gerador'], r['arestas'], r['operacao']): r for r in json.load(f)['resultados']}
+    print(f"\nComparação com {arquivo_base}:")
+    for r in atuais:
+        anterior = base.get((r['gerador'], r['arestas'], r['operacao']))
+        if anterior is not None and anterior['tempo_s'] > 0:
+            print(f"{r['gerador']:>16} {r['arestas']:>10} {r['operacao']:>26} "
+                  f"{r['tempo_s'] / anterior['tempo_s']:8.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--geradores', nargs='+', choices=sorted(GERADORES), default=sorted(GERADORES))
+    parser.add_argument('--tamanhos', nargs='+', type=int, default=[1_000, 10_000, 100_000],
+                        help="número de arestas de cada grafo (até 10M)")
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--sem-memoria', action='store_true', help="não mede o pico de memória")
+    parser.add_argument('--limite-objetos', type=int, default=LIMITE_OBJETOS)
+    parser.add_argument('--saida', help="arquivo JSON com os resultados")
+    parser.add_argument('--comparar', help="JSON de uma execução anterior")
+    args = parser.parse_args()
+
+    resultados = []
+    for m in args.tamanhos:
+        for nome in args.geradores:
+            resultados += executar_caso(nome, m, args.repeticoes, not args.sem_memoria, args.limite_objetos)
+
+    if args.saida:
+        with open(args.saida, 'w') as f:
+            json.dump({
+                'commit': _commit_atual(),
+                'data': datetime.now(timezone.utc).isoformat(),
+                'python': platform.python_version(),
+                'numpy': np.__version__,
+                'resultados': resultados,
+            }, f, indent=2)
+    if args.comparar:
+        comparar(resultados, args.comparar)
+
+
+if __name__ == '__main__':
+    main()
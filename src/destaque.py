@@ -0,0 +1,67 @@
+# Resultados dos algoritmos (BFS, DFS, SCC) em vetores compactos, enviados ao
+# navegador pelo dcc.Store 'resultado-algoritmo'. As classes dos elementos do
+# Cytoscape e o texto do resultado são gerados no cliente
+# (assets/destaque.js), sem reenviar a lista de elementos.
+#
+# Vetores de inteiros vão como base64 de int32 little-endian, lidos direto
+# em um Int32Array no navegador.
+
+import base64
+
+import numpy as np
+
+
+def vetor_int32(valores):
+    return base64.b64encode(np.asarray(valores, dtype='<i4').tobytes()).decode('ascii')
+
+
+def resultado_percurso(algoritmo, start_node, arestas_visitadas, orientado, visiveis=None):
+    # 'nos' em ordem de visita; cada aresta da árvore de busca descobre um nó,
+    # então basta guardar, para cada nó, o índice em 'nos' do nó de onde a
+    # aresta parte (-1 na origem da busca, ou quando a aresta não é enviada)
+    nos = [str(start_node)]
+    indice = {nos[0]: 0}
+    pais = [-1]
+    for u, v in arestas_visitadas:
+        pais.append(indice[str(u)])
+        indice[str(v)] = len(nos)
+        nos.append(str(v))
+    total = len(nos)
+
+    if visiveis is not None:
+        # Modo resumo: só os nós exibidos, e as arestas entre eles
+        manter = [k for k, no in enumerate(nos) if no in visiveis]
+        novo = {k: i for i, k in enumerate(manter)}
+        pais = [novo.get(pais[k], -1) for k in manter]
+        nos = [nos[k] for k in manter]
+
+    return {
+        'algoritmo': algoritmo,
+        'orientado': orientado,
+        'origem': str(start_node),
+        'nos': nos,
+        'pais': vetor_int32(pais),
+        'total': total,
+    }
+
+
+def resultado_componentes(rotulos, componente, visiveis=None):
+    # Nós ordenados por componente (e por rótulo dentro dela), com o número
+    # de nós de cada componente: a codificação por carreiras (RLE) do vetor
+    # de componentes. 'visiveis' restringe aos nós exibidos (no modo resumo,
+    # os vértices dos grupos expandidos); componentes sem nó visível ficam
+    # com tamanho 0
+    nos = np.array(list(map(str, rotulos)), dtype=object)
+    num_componentes = int(componente.max()) + 1 if componente.size else 0
+    if visiveis is not None:
+        manter = np.fromiter((no in visiveis for no in nos), dtype=bool, count=nos.size)
+        nos, componente = nos[manter], componente[manter]
+
+    ordem = np.lexsort((nos.astype(str), componente)) if nos.size else np.empty(0, dtype=np.int64)
+    return {
+        'algoritmo': 'scc',
+        'orientado': True,
+        'nos': nos[ordem].tolist(),
+        'tamanhos': vetor_int32(np.bincount(componente, minlength=num_componentes)),
+        'parcial': visiveis is not None,
+    }
@@ -0,0 +1,292 @@
+import math
+
+import numpy as np
+import networkx as nx
+
+# A cada quantos vértices visitados as buscas chamam o callback de progresso
+INTERVALO_PROGRESSO = 1 << 16
+
+
+class TabelaRotulos:
+    """Rótulos dos vértices como um único bloco de bytes UTF-8 separados por '\n'.
+
+    É o formato da seção de rótulos do snapshot binário: carregar o snapshot
+    não cria um objeto por vértice. Cada acesso por índice decodifica só o
+    rótulo pedido, e a iteração decodifica o bloco inteiro de uma vez.
+    """
+
+    def __init__(self, dados):
+        self.dados = np.asarray(dados, dtype=np.uint8)
+        # Início de cada rótulo; o último valor é o fim do bloco mais o separador
+        quebras = np.flatnonzero(self.dados == ord('\n'))
+        self.inicios = np.concatenate(([0], quebras + 1, [self.dados.size + 1])) \
+            if self.dados.size else np.zeros(1, dtype=np.int64)
+
+    def __len__(self):
+        return self.inicios.size - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[k] for k in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return bytes(self.dados[self.inicios[i]:self.inicios[i + 1] - 1]).decode('utf-8')
+
+    def __iter__(self):
+        if not len(self):
+            return iter(())
+        return iter(bytes(self.dados).decode('utf-8').split('\n'))
+
+
+class GrafoCSR:
+    """Grafo orientado armazenado em vetores CSR (compressed sparse row).
+
+    Os sucessores do vértice de id 'i' ficam em indices[offsets[i]:offsets[i + 1]],
+    com os pesos correspondentes em 'pesos' (NaN quando a aresta não tem peso).
+    Os métodos com nomes do NetworkX permitem usar o grafo nas mesmas funções
+    que recebem um nx.DiGraph.
+
+    'rotulos' pode ser uma TabelaRotulos: ela só vira lista na primeira
+    alteração de vértices, e o dicionário 'ids' (rótulo -> id) só é montado
+    na primeira consulta por rótulo.
+    """
+
+    def __init__(self, rotulos, offsets, indices, pesos):
+        self.rotulos = rotulos if isinstance(rotulos, TabelaRotulos) else list(rotulos)
+        self._ids = None
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.pesos = np.asarray(pesos, dtype=np.float64)
+
+    @classmethod
+    def de_arestas(cls, arestas):
+        """Monta o CSR a partir de um ArestasNumpy (ver carregar_arestas_numpy)."""
+        n = len(arestas.rotulos)
+        origem = arestas.origem.astype(np.int64)
+        destino = arestas.destino.astype(np.int64)
+
+        # Ordena por (origem, destino) e descarta arestas repetidas. Como no
+        # NetworkX, uma repetição sem peso não apaga o peso anterior: cada
+        # aresta fica com o último peso informado para ela, se houver
+        chaves = origem * n + destino
+        unicas, ultimas = np.unique(chaves[::-1], return_index=True)
+        ordem = chaves.size - 1 - ultimas
+        pesos = arestas.pesos[ordem]
+
+        # Só há o que corrigir com arestas repetidas e pesos em parte das linhas
+        sem_peso = np.isnan(arestas.pesos)
+        if unicas.size < chaves.size and sem_peso.any() and not sem_peso.all():
+            com_peso = np.flatnonzero(~sem_peso)
+            chaves_peso, ultimas = np.unique(chaves[com_peso][::-1], return_index=True)
+            pesos[np.searchsorted(unicas, chaves_peso)] = arestas.pesos[com_peso[com_peso.size - 1 - ultimas]]
+
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(origem[ordem], minlength=n), out=offsets[1:])
+        return cls(arestas.rotulos.tolist(), offsets, destino[ordem], pesos)
+
+    @classmethod
+    def de_networkx(cls, G):
+        rotulos = list(G.nodes())
+        ids = {rotulo: i for i, rotulo in enumerate(rotulos)}
+        offsets = np.zeros(len(rotulos) + 1, dtype=np.int64)
+        indices = []
+        pesos = []
+        for i, rotulo in enumerate(rotulos):
+            for vizinho, data in G.adj[rotulo].items():
+                indices.append(ids[vizinho])
+                pesos.append(float(data['weight']) if 'weight' in data else np.nan)
+            offsets[i + 1] = len(indices)
+        return cls(rotulos, offsets, indices, pesos)
+
+    def para_networkx(self):
+        G = nx.DiGraph()
+        G.add_nodes_from(self.rotulos)
+        G.add_edges_from(self.edges(data=True))
+        return G
+
+    @property
+    def ids(self):
+        if self._ids is None:
+            self._ids = {rotulo: i for i, rotulo in enumerate(self.rotulos)}
+        return self._ids
+
+    def _lista_rotulos(self):
+        # Rótulos como lista, para as alterações de vértices
+        if isinstance(self.rotulos, TabelaRotulos):
+            self.rotulos = list(self.rotulos)
+        return self.rotulos
+
+    # Consultas
+
+    def _id(self, rotulo):
+        if rotulo not in self.ids:
+            raise ValueError("Vértice não existe.")
+        return self.ids[rotulo]
+
+    def vizinhos(self, i):
+        return self.indices[self.offsets[i]:self.offsets[i + 1]]
+
+    def _posicao(self, u, v):
+        # Posição da aresta (u, v) em 'indices', ou -1 se não existir
+        inicio, fim = self.offsets[u], self.offsets[u + 1]
+        encontrados = np.flatnonzero(self.indices[inicio:fim] == v)
+        return int(inicio + encontrados[0]) if encontrados.size else -1
+
+    def __contains__(self, rotulo):
+        return rotulo in self.ids
+
+    def __len__(self):
+        return self.offsets.size - 1
+
+    def is_directed(self):
+        return True
+
+    def number_of_nodes(self):
+        return self.offsets.size - 1
+
+    def number_of_edges(self):
+        return int(self.indices.size)
+
+    def nodes(self):
+        return iter(self.rotulos)
+
+    def successors(self, rotulo):
+        rotulos = self.rotulos
+        return (rotulos[v] for v in self.vizinhos(self._id(rotulo)).tolist())
+
+    def has_edge(self, source, target):
+        if source not in self.ids or target not in self.ids:
+            return False
+        return self._posicao(self.ids[source], self.ids[target]) >= 0
+
+    def peso(self, source, target):
+        # Peso da aresta, ou None se ela não tiver peso
+        posicao = self._posicao(self._id(source), self._id(target))
+        if posicao < 0:
+            raise ValueError("Aresta não existe.")
+        w = float(self.pesos[posicao])
+        return None if math.isnan(w) else w
+
+    def edges(self, data=False):
+        rotulos = list(self.rotulos)
+        origens = np.repeat(np.arange(len(rotulos)), np.diff(self.offsets)).tolist()
+        destinos = self.indices.tolist()
+        if not data:
+            return ((rotulos[u], rotulos[v]) for u, v in zip(origens, destinos))
+        return (
+            (rotulos[u], rotulos[v], {} if math.isnan(w) else {'weight': w})
+            for u, v, w in zip(origens, destinos, self.pesos.tolist())
+        )
+
+    def arestas_incidentes(self, rotulo):
+        # Arestas (u, v, data) que saem ou chegam em 'rotulo', com o auto-loop
+        # uma única vez: as de entrada saem de uma comparação sobre 'indices'
+        k = self._id(rotulo)
+        inicio, fim = self.offsets[k], self.offsets[k + 1]
+        entrada = np.flatnonzero(self.indices == k)
+        entrada = entrada[(entrada < inicio) | (entrada >= fim)]
+        origens = np.searchsorted(self.offsets, entrada, side='right') - 1
+
+        rotulos = self.rotulos
+        saida = zip(self.indices[inicio:fim].tolist(), self.pesos[inicio:fim].tolist())
+        return [
+            (rotulo, rotulos[v], {} if math.isnan(w) else {'weight': w}) for v, w in saida
+        ] + [
+            (rotulos[u], rotulo, {} if math.isnan(w) else {'weight': w})
+            for u, w in zip(origens.tolist(), self.pesos[entrada].tolist())
+        ]
+
+    # Alterações: o CSR é otimizado para leitura, então cada alteração
+    # desloca os vetores (O(V + E)), sem criar objetos por aresta.
+
+    def adicionar_vertice(self, rotulo):
+        if rotulo in self.ids:
+            return
+        self.ids[rotulo] = len(self.rotulos)
+        self._lista_rotulos().append(rotulo)
+        self.offsets = np.append(self.offsets, self.offsets[-1])
+
+    def adicionar_aresta(self, source, target, weight=None):
+        u, v = self._id(source), self._id(target)
+        peso = np.nan if weight is None else float(weight)
+        posicao = self._posicao(u, v)
+        if posicao >= 0:
+            # Assim como no NetworkX, adicionar sem peso preserva o peso atual
+            if weight is not None:
+                self.pesos[posicao] = peso
+            return
+        fim = self.offsets[u + 1]
+        self.indices = np.insert(self.indices, fim, v)
+        self.pesos = np.insert(self.pesos, fim, peso)
+        self.offsets[u + 1:] += 1
+
+    def remover_aresta(self, source, target):
+        u, v = self._id(source), self._id(target)
+        posicao = self._posicao(u, v)
+        if posicao < 0:
+            raise ValueError("Aresta não existe.")
+        self.indices = np.delete(self.indices, posicao)
+        self.pesos = np.delete(self.pesos, posicao)
+        self.offsets[u + 1:] -= 1
+
+    def remover_vertice(self, rotulo):
+        k = self._id(rotulo)
+        graus = np.diff(self.offsets)
+        origens = np.repeat(np.arange(len(self.rotulos)), graus)
+
+        # Remove a linha do vértice e todas as arestas que chegam nele
+        manter = (origens != k) & (self.indices != k)
+        graus = np.bincount(origens[manter], minlength=len(self.rotulos))
+        graus = np.delete(graus, k)
+        indices = self.indices[manter]
+        indices[indices > k] -= 1
+
+        self.offsets = np.zeros(graus.size + 1, dtype=np.int64)
+        np.cumsum(graus, out=self.offsets[1:])
+        self.indices = indices
+        self.pesos = self.pesos[manter]
+        del self._lista_rotulos()[k]
+        self._ids = None
+
+    # Buscas, na mesma ordem de nx.bfs_edges e nx.dfs_edges. O callback
+    # opcional 'progresso(visitados, total)' é chamado periodicamente.
+
+    def bfs_arestas(self, source, progresso=None):
+        s = self._id(source)
+        visitado = bytearray(len(self.rotulos))
+        visitado[s] = 1
+        fila = [s]
+        resultado = []
+        rotulos = self.rotulos
+        for u in fila:
+            for v in self.vizinhos(u).tolist():
+                if not visitado[v]:
+                    visitado[v] = 1
+                    fila.append(v)
+                    resultado.append((rotulos[u], rotulos[v]))
+                    if progresso is not None and len(fila) % INTERVALO_PROGRESSO == 0:
+                        progresso(len(fila), len(self.rotulos))
+        return resultado
+
+    def dfs_arestas(self, source, progresso=None):
+        s = self._id(source)
+        visitado = bytearray(len(self.rotulos))
+        visitado[s] = 1
+        pilha = [(s, iter(self.vizinhos(s).tolist()))]
+        resultado = []
+        rotulos = self.rotulos
+        while pilha:
+            pai, filhos = pilha[-1]
+            for filho in filhos:
+                if not visitado[filho]:
+                    visitado[filho] = 1
+                    resultado.append((rotulos[pai], rotulos[filho]))
+                    pilha.append((filho, iter(self.vizinhos(filho).tolist())))
+                    if progresso is not None and len(resultado) % INTERVALO_PROGRESSO == 0:
+                        progresso(len(resultado), len(self.rotulos))
+                    break
+            else:
+                pilha.pop()
+        return resultado
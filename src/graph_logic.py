@@ -1,34 +1,102 @@
+import codecs
+import io
+import math
 import os
+import gzip
+import struct
+import uuid
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager, nullcontext
+from itertools import islice
+
 import networkx as nx
+import numpy as np
+
+from grafo_csr import GrafoCSR, TabelaRotulos
+from scc import ComponentesDinamicas
+from posicoes import Posicoes
+from metricas import metricas
+
+def _abrir_leitura(arquivo, binario=False):
+    # 'arquivo' pode ser um caminho, um buffer de bytes ou um objeto de arquivo
+    # (texto ou binário). Objetos recebidos do chamador não são fechados.
+    if isinstance(arquivo, (bytes, bytearray, memoryview)):
+        # Buffer criado aqui: pode ser fechado, e o TextIOWrapper lê as linhas
+        # bem mais rápido que o leitor de codecs
+        buffer = io.BytesIO(arquivo)
+        return nullcontext(buffer) if binario else io.TextIOWrapper(buffer, encoding='utf-8')
+    if hasattr(arquivo, 'read'):
+        if not binario and not isinstance(arquivo, io.TextIOBase):
+            arquivo = codecs.getreader('utf-8')(arquivo)
+        return nullcontext(arquivo)
+
+    compressao = _compressao_do_arquivo(str(arquivo))
+    modo = 'rb' if binario else 'rt'
+    if compressao == 'gzip':
+        return gzip.open(arquivo, modo, encoding=None if binario else 'utf-8')
+    if compressao == 'zstd':
+        try:
+            import zstandard
+        except ImportError:
+            raise ValueError("Compressão zstd requer o pacote 'zstandard'.")
+        leitor = zstandard.ZstdDecompressor().stream_reader(open(arquivo, 'rb'), closefd=True)
+        return leitor if binario else io.TextIOWrapper(leitor, encoding='utf-8')
+    return open(arquivo, modo)
 
-def carregar_grafo_txt(arquivo):
+# Quantidade de arestas acumuladas antes de cada inserção em lote no grafo.
+# Lotes pequenos: os dicionários de peso ainda vivos no lote são percorridos
+# pelo coletor de lixo, e lotes grandes deixam o carregamento mais lento
+TAMANHO_LOTE = 256
+
+@metricas.cronometrado
+def carregar_grafo_txt(arquivo, tamanho_lote=TAMANHO_LOTE):
     G = nx.DiGraph()
     ponderado = False
     orientado = True
 
     try:
-        with open(arquivo, 'r') as f:
-            linhas = f.readlines()
+        contexto = _abrir_leitura(arquivo)
     except FileNotFoundError:
         raise FileNotFoundError(f"Arquivo não encontrado: {arquivo}")
 
-    if not linhas:
-        return G, ponderado, orientado
+    with contexto as f:
+        # Lê o arquivo linha a linha, sem manter o texto inteiro em memória
+        cabecalho = f.readline()
+        if not cabecalho:
+            return G, ponderado, orientado
 
-    try:
-        num_vertices, num_arestas = map(int, linhas[0].split())
-    except ValueError:
-        raise ValueError("Formato de arquivo inválido.")
+        try:
+            num_vertices, num_arestas = map(int, cabecalho.split())
+        except ValueError:
+            raise ValueError("Formato de arquivo inválido.")
 
-    for linha in linhas[1:]:
-        aresta = linha.split()
-        if len(aresta) == 2:
-            G.add_edge(aresta[0], aresta[1])
-        elif len(aresta) == 3:
-            G.add_edge(aresta[0], aresta[1], weight=float(aresta[2]))
-            ponderado = True
-        else:
-            raise ValueError("Formato de aresta inválido.")
+        # Cada linha é lida uma única vez e já vira a tupla final: (origem,
+        # destino), sem um dicionário por aresta, ou (origem, destino, {'weight': w}).
+        # None marca uma linha com o número errado de colunas (inclusive vazia)
+        lidas = 0
+        while True:
+            lote = [
+                (aresta[0], aresta[1]) if len(aresta) == 2
+                else (aresta[0], aresta[1], {'weight': float(aresta[2])}) if len(aresta) == 3
+                else None
+                for aresta in map(str.split, islice(f, tamanho_lote))
+            ]
+            if not lote:
+                break
+            if None in lote:
+                raise ValueError("Formato de aresta inválido.")
+            lidas += len(lote)
+            if lidas > num_arestas:
+                raise ValueError(f"O arquivo possui mais arestas do que as {num_arestas} informadas no cabeçalho.")
+            if not ponderado:
+                ponderado = any(len(aresta) == 3 for aresta in lote)
+            G.add_edges_from(lote)
+
+    # Confere as contagens do cabeçalho com o que foi lido na mesma passada
+    if lidas < num_arestas:
+        raise ValueError(f"Arquivo truncado: esperadas {num_arestas} arestas, encontradas {lidas}.")
+    if G.number_of_nodes() > num_vertices:
+        raise ValueError(f"O arquivo possui mais vértices do que os {num_vertices} informados no cabeçalho.")
 
     # Verificar se o grafo é direcionado (DiGraph)
     if isinstance(G, nx.DiGraph):
@@ -36,88 +104,788 @@ def carregar_grafo_txt(arquivo):
 
     return G, ponderado, orientado
 
-def salvar_grafo_txt(G, filename='graph.txt'):
-    if not isinstance(G, (nx.Graph, nx.DiGraph)):
-        raise ValueError("O objeto fornecido não é um grafo válido do NetworkX.")
-    
+# Lista de arestas em forma de vetores: 'rotulos' traduz o id inteiro de cada
+# vértice para o seu rótulo original e 'pesos' usa NaN nas arestas sem peso.
+ArestasNumpy = namedtuple('ArestasNumpy', ['rotulos', 'origem', 'destino', 'pesos'])
+
+# Rótulos com até este número de bytes são comparados como inteiros de 64 bits
+# (ver _fatorar); acima dele, como strings de bytes
+TAMANHO_MAXIMO_ROTULO = 63
+# Bytes que separam tokens: espaço, tabulação e quebras de linha
+SEPARADORES = np.zeros(256, dtype=bool)
+SEPARADORES[[ord(' '), ord('\t'), ord('\r'), ord('\n')]] = True
+
+def _tokens(dados):
+    # Início, tamanho e linha de cada token, calculados sobre os bytes (sem
+    # criar um objeto por token), e o número de linhas do arquivo
+    quebra = dados == ord('\n')
+    separador = SEPARADORES[dados]
+    borda = np.diff(np.concatenate(([True], separador, [True])).view(np.int8))
+    inicios = np.flatnonzero(borda == -1)  # Separador seguido de token
+    tamanhos = np.flatnonzero(borda == 1) - inicios
+    linhas = np.cumsum(quebra)[inicios]
+    num_linhas = int(quebra.sum()) + (not quebra[-1])  # A última linha pode não ter '\n'
+    return inicios, tamanhos, linhas, num_linhas
+
+def _bytes_tokens(dados, inicios, tamanhos, largura):
+    # Matriz (tokens x largura) com os bytes de cada token, completada com
+    # zeros; preenchida por coluna, sem índices intermediários de tokens x largura
+    matriz = np.zeros((inicios.size, largura), dtype=np.uint8)
+    for j in range(largura):
+        coluna = dados[np.minimum(inicios + j, dados.size - 1)]
+        coluna[tamanhos <= j] = 0
+        matriz[:, j] = coluna
+    return matriz
+
+def _fatorar(dados, inicios, tamanhos):
+    # Rótulos distintos (na ordem da primeira ocorrência) e o id de cada token
+    largura = int(tamanhos.max())
+    if largura > TAMANHO_MAXIMO_ROTULO:
+        tokens = np.array([bytes(dados[i:i + t]) for i, t in zip(inicios.tolist(), tamanhos.tolist())])
+        rotulos, primeiro, inverso = np.unique(tokens, return_index=True, return_inverse=True)
+    else:
+        # Bytes do token e o seu tamanho no último byte, lidos como palavras
+        # de 64 bits: ordenar inteiros é bem mais rápido que ordenar strings
+        palavras = (largura + 8) // 8
+        matriz = np.zeros((inicios.size, 8 * palavras), dtype=np.uint8)
+        matriz[:, :largura] = _bytes_tokens(dados, inicios, tamanhos, largura)
+        matriz[:, -1] = tamanhos
+        chaves = matriz.view('>u8').astype(np.uint64)
+        ordem = np.argsort(chaves[:, 0]) if palavras == 1 else np.lexsort(chaves.T[::-1])
+        ordenadas = chaves[ordem]
+        novo = np.ones(ordem.size, dtype=bool)
+        novo[1:] = (ordenadas[1:] != ordenadas[:-1]).any(axis=1)
+        # A ordenação não é estável: a primeira ocorrência é o menor índice do grupo
+        primeiro = np.minimum.reduceat(ordem, np.flatnonzero(novo))
+        inverso = np.empty_like(ordem)
+        inverso[ordem] = np.cumsum(novo) - 1
+        rotulos = matriz[primeiro, :largura].view(f'S{largura}').ravel()
+
+    ordem = np.argsort(primeiro, kind='stable')
+    posicao = np.empty_like(ordem)
+    posicao[ordem] = np.arange(ordem.size)
+    rotulos = rotulos[ordem]
+    try:
+        rotulos = rotulos.astype(str)  # Só converte rótulos ASCII, bem mais rápido
+    except UnicodeDecodeError:
+        rotulos = np.char.decode(rotulos, 'utf-8')
+    return rotulos, posicao[inverso.ravel()].astype(np.int32)
+
+def carregar_arestas_numpy(arquivo):
+    try:
+        with _abrir_leitura(arquivo, binario=True) as f:
+            cabecalho = f.readline()
+            corpo = f.read()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Arquivo não encontrado: {arquivo}")
+
+    # Objetos de arquivo em modo texto devolvem str
+    if isinstance(cabecalho, str):
+        cabecalho, corpo = cabecalho.encode('utf-8'), corpo.encode('utf-8')
+
+    vazio = np.empty(0, dtype=np.int32)
+    if not cabecalho:
+        return ArestasNumpy(np.empty(0, dtype=str), vazio, vazio, np.empty(0))
+
+    try:
+        num_vertices, num_arestas = map(int, cabecalho.split())
+    except ValueError:
+        raise ValueError("Formato de arquivo inválido.")
+
+    dados = np.frombuffer(corpo, dtype=np.uint8)
+    if dados.size == 0:
+        if num_arestas > 0:
+            raise ValueError(f"Arquivo truncado: esperadas {num_arestas} arestas, encontradas 0.")
+        return ArestasNumpy(np.empty(0, dtype=str), vazio, vazio, np.empty(0))
+
+    # Mesmas regras de carregar_grafo_txt: toda linha (inclusive vazia) é
+    # uma aresta com 2 ou 3 colunas
+    inicios, tamanhos, linhas, num_linhas = _tokens(dados)
+    por_linha = np.bincount(linhas, minlength=num_linhas)
+    if ((por_linha != 2) & (por_linha != 3)).any():
+        raise ValueError("Formato de aresta inválido.")
+    if num_linhas > num_arestas:
+        raise ValueError(f"O arquivo possui mais arestas do que as {num_arestas} informadas no cabeçalho.")
+    if num_linhas < num_arestas:
+        raise ValueError(f"Arquivo truncado: esperadas {num_arestas} arestas, encontradas {num_linhas}.")
+
+    # Coluna de cada token dentro da sua linha
+    primeiro_da_linha = np.concatenate(([0], np.cumsum(por_linha)[:-1]))
+    coluna = np.arange(inicios.size) - primeiro_da_linha[linhas]
+    extremos = coluna < 2
+    rotulos, ids = _fatorar(dados, inicios[extremos], tamanhos[extremos])
+    if rotulos.size > num_vertices:
+        raise ValueError(f"O arquivo possui mais vértices do que os {num_vertices} informados no cabeçalho.")
+    ids = ids.reshape(-1, 2)
+
+    pesos = np.full(num_arestas, np.nan)
+    com_peso = coluna == 2
+    if com_peso.any():
+        largura = int(tamanhos[com_peso].max())
+        texto = _bytes_tokens(dados, inicios[com_peso], tamanhos[com_peso], largura).view(f'S{largura}').ravel()
+        pesos[linhas[com_peso]] = texto.astype(np.float64)
+
+    return ArestasNumpy(rotulos, ids[:, 0], ids[:, 1], pesos)
+
+@metricas.cronometrado
+def carregar_grafo_csr(arquivo):
+    # Mesmo retorno de carregar_grafo_txt, mas com o grafo guardado em vetores CSR
+    arestas = carregar_arestas_numpy(arquivo)
+    ponderado = not np.isnan(arestas.pesos).all()
+    return GrafoCSR.de_arestas(arestas), ponderado, True
+
+# Tamanho do buffer de escrita e quantidade de arestas formatadas por bloco
+TAMANHO_BUFFER = 1 << 20
+TAMANHO_BLOCO_ESCRITA = 65536
+
+def _compressao_do_arquivo(filename):
+    if filename.endswith('.gz'):
+        return 'gzip'
+    if filename.endswith('.zst'):
+        return 'zstd'
+    return None
+
+@contextmanager
+def _abrir_escrita(filename, compressao=None, tamanho_buffer=TAMANHO_BUFFER, atomico=True):
+    # Escreve em um arquivo temporário no mesmo diretório e só o renomeia para
+    # o destino final quando tudo foi gravado, evitando arquivos pela metade.
+    # 'filename' também pode ser um objeto binário já aberto (ex.: io.BytesIO).
+    if hasattr(filename, 'write'):
+        if compressao == 'gzip':
+            with gzip.GzipFile(fileobj=filename, mode='wb') as f:
+                yield f
+        elif compressao is None:
+            yield filename
+        else:
+            raise ValueError(f"Compressão não suportada para objetos de arquivo: {compressao}")
+        return
+
     dir_name = os.path.dirname(filename)
     if dir_name and not os.path.exists(dir_name):
         os.makedirs(dir_name)
 
-    with open(filename, 'w') as f:
-        try:
-            f.write(f"{G.number_of_nodes()} {G.number_of_edges()}\n")
-            for source, target, data in G.edges(data=True):
-                if 'weight' in data:
-                    f.write(f"{source} {target} {float(data['weight'])}\n")
-                else:
-                    f.write(f"{source} {target}\n")
-        except Exception as e:
-            raise IOError(f"Erro ao salvar o grafo no arquivo '{filename}': {e}")
+    if atomico:
+        caminho = os.path.join(dir_name, f".{os.path.basename(filename)}.{os.getpid()}.{uuid.uuid4().hex}.tmp")
+        bruto = open(caminho, 'xb', buffering=tamanho_buffer)
+    else:
+        caminho = filename
+        bruto = open(filename, 'wb', buffering=tamanho_buffer)
+
+    try:
+        with bruto:
+            if compressao == 'gzip':
+                with gzip.GzipFile(fileobj=bruto, mode='wb') as f:
+                    yield f
+            elif compressao == 'zstd':
+                try:
+                    import zstandard
+                except ImportError:
+                    raise ValueError("Compressão zstd requer o pacote 'zstandard'.")
+                with zstandard.ZstdCompressor().stream_writer(bruto, closefd=False) as f:
+                    yield f
+            elif compressao is None:
+                yield bruto
+            else:
+                raise ValueError(f"Compressão desconhecida: {compressao}")
+        if atomico:
+            os.replace(caminho, filename)
+    except BaseException:
+        if atomico and os.path.exists(caminho):
+            os.remove(caminho)
+        raise
+
+def _blocos_arestas(G, tamanho_bloco):
+    # Gera o texto das arestas em blocos de 'tamanho_bloco' linhas
+    if isinstance(G, GrafoCSR):
+        # Formata direto dos vetores, sem criar um dicionário por aresta
+        rotulos = np.array(list(G.rotulos), dtype=object)
+        origens = np.repeat(np.arange(len(rotulos)), np.diff(G.offsets))
+        for inicio in range(0, G.indices.size, tamanho_bloco):
+            fim = inicio + tamanho_bloco
+            us = rotulos[origens[inicio:fim]]
+            vs = rotulos[G.indices[inicio:fim]]
+            pesos = G.pesos[inicio:fim]
+            sem_peso = np.isnan(pesos)
+            if sem_peso.all():
+                yield ''.join(map('{} {}\n'.format, us, vs))
+            elif not sem_peso.any():
+                yield ''.join(map('{} {} {}\n'.format, us, vs, pesos.tolist()))
+            else:
+                yield ''.join([
+                    f"{u} {v}\n" if math.isnan(w) else f"{u} {v} {w}\n"
+                    for u, v, w in zip(us, vs, pesos.tolist())
+                ])
+    else:
+        arestas = iter(_arestas_com_dados(G))
+        while True:
+            bloco = ''.join(
+                f"{source} {target} {float(data['weight'])}\n" if 'weight' in data else f"{source} {target}\n"
+                for source, target, data in islice(arestas, tamanho_bloco)
+            )
+            if not bloco:
+                break
+            yield bloco
+
+@metricas.cronometrado
+def salvar_grafo_txt(G, filename='graph.txt', compressao=None, tamanho_buffer=TAMANHO_BUFFER,
+                     tamanho_bloco=TAMANHO_BLOCO_ESCRITA, atomico=True):
+    if not isinstance(G, (nx.Graph, nx.DiGraph, GrafoCSR)):
+        raise ValueError("O objeto fornecido não é um grafo válido do NetworkX.")
+
+    if compressao is None and isinstance(filename, str):
+        compressao = _compressao_do_arquivo(filename)
+
+    try:
+        with _abrir_escrita(filename, compressao, tamanho_buffer, atomico) as f:
+            f.write(f"{G.number_of_nodes()} {G.number_of_edges()}\n".encode('utf-8'))
+            # Uma única escrita por bloco de arestas
+            for bloco in _blocos_arestas(G, tamanho_bloco):
+                f.write(bloco.encode('utf-8'))
+    except ValueError:
+        raise
+    except Exception as e:
+        raise IOError(f"Erro ao salvar o grafo no arquivo '{filename}': {e}")
+
+# Snapshot binário: cabeçalho fixo, tabela de rótulos (UTF-8 separados por
+# '\n') e os vetores CSR offsets (int64), indices (int32) e pesos (float64),
+# cada seção alinhada em 8 bytes para permitir o acesso direto via mmap.
+MAGICO_BIN = b'GRAFOCSR'
+VERSAO_BIN = 1
+CABECALHO_BIN = struct.Struct('<8sIIQQQ')
+FLAG_ORIENTADO = 1
+FLAG_PONDERADO = 2
+
+def _alinhar(tamanho):
+    return (tamanho + 7) & ~7
+
+@metricas.cronometrado
+def salvar_grafo_bin(G, filename='graph.bin'):
+    if isinstance(G, GrafoCSR):
+        csr = G
+    elif isinstance(G, (nx.Graph, nx.DiGraph)):
+        csr = GrafoCSR.de_networkx(G)
+    else:
+        raise ValueError("O objeto fornecido não é um grafo válido do NetworkX.")
+
+    if isinstance(csr.rotulos, TabelaRotulos):
+        rotulos = csr.rotulos.dados.tobytes()  # Já está no formato do arquivo
+    else:
+        rotulos = '\n'.join(map(str, csr.rotulos)).encode('utf-8')
+    flags = 0
+    if G.is_directed():
+        flags |= FLAG_ORIENTADO
+    if not np.isnan(csr.pesos).all():
+        flags |= FLAG_PONDERADO
+
+    try:
+        with _abrir_escrita(filename) as f:
+            f.write(CABECALHO_BIN.pack(MAGICO_BIN, VERSAO_BIN, flags, len(csr.rotulos), csr.indices.size, len(rotulos)))
+            for secao in (rotulos, csr.offsets.astype('<i8').tobytes(),
+                          csr.indices.astype('<i4').tobytes(), csr.pesos.astype('<f8').tobytes()):
+                f.write(secao)
+                f.write(b'\0' * (_alinhar(len(secao)) - len(secao)))
+    except Exception as e:
+        raise IOError(f"Erro ao salvar o grafo no arquivo '{filename}': {e}")
+
+def eh_snapshot_bin(dados):
+    return bytes(dados[:len(MAGICO_BIN)]) == MAGICO_BIN
+
+@metricas.cronometrado
+def carregar_grafo_bin(arquivo):
+    if isinstance(arquivo, (bytes, bytearray, memoryview)):
+        # Snapshot já em memória (ex.: upload): uma única cópia gravável
+        dados = np.frombuffer(bytearray(arquivo), dtype=np.uint8)
+    else:
+        if not os.path.exists(arquivo):
+            raise FileNotFoundError(f"Arquivo não encontrado: {arquivo}")
+        if os.path.getsize(arquivo) < CABECALHO_BIN.size:
+            raise ValueError("Formato de arquivo inválido.")
+        # Mapeia o arquivo em modo copy-on-write: as páginas são compartilhadas
+        # entre processos e só são copiadas se o grafo for alterado
+        dados = np.memmap(arquivo, dtype=np.uint8, mode='c')
+
+    if dados.size < CABECALHO_BIN.size:
+        raise ValueError("Formato de arquivo inválido.")
+    magico, versao, flags, n, m, tamanho_rotulos = CABECALHO_BIN.unpack(bytes(dados[:CABECALHO_BIN.size]))
+    if magico != MAGICO_BIN or versao != VERSAO_BIN:
+        raise ValueError("Formato de arquivo inválido.")
+
+    secoes = [tamanho_rotulos, (n + 1) * 8, m * 4, m * 8]
+    inicios = CABECALHO_BIN.size + np.concatenate(([0], np.cumsum([_alinhar(t) for t in secoes])))
+    if dados.size < inicios[-1] - (_alinhar(secoes[-1]) - secoes[-1]):
+        raise ValueError("Arquivo truncado.")
+
+    def secao(i, dtype):
+        return dados[inicios[i]:inicios[i] + secoes[i]].view(dtype)
+
+    rotulos = TabelaRotulos(secao(0, np.uint8))
+    if len(rotulos) != n:
+        raise ValueError("Formato de arquivo inválido.")
+    G = GrafoCSR(rotulos, secao(1, '<i8'), secao(2, '<i4'), secao(3, '<f8'))
+
+    orientado = bool(flags & FLAG_ORIENTADO)
+    if not orientado:
+        G = nx.Graph(G.para_networkx())
+    return G, bool(flags & FLAG_PONDERADO), orientado
+
+def adicionar_vertice(G, node):
+    if isinstance(G, GrafoCSR):
+        G.adicionar_vertice(node)
+    else:
+        G.add_node(node)
 
 def adicionar_aresta(G, source, target, weight=None):
     # Verifica se os vértices existem no grafo
-    if source not in G.nodes or target not in G.nodes:
+    if source not in G or target not in G:
         raise ValueError("Um ou ambos os vértices não existem no grafo.")
     
     # Adiciona a aresta, mesmo se for um auto-loop (source == target)
-    if weight is not None:
+    if isinstance(G, GrafoCSR):
+        G.adicionar_aresta(source, target, weight)
+    elif weight is not None:
         G.add_edge(source, target, weight=float(weight))
     else:
         G.add_edge(source, target)
-    
-    # Atualiza as variáveis globais ponderado e orientado
-    global ponderado, orientado
-    ponderado = any('weight' in data for _, _, data in G.edges(data=True))
-    orientado = isinstance(G, nx.DiGraph)
 
 def remover_aresta(G, source, target):
     if not G.has_edge(source, target):
         raise ValueError("Aresta não existe.")
-    G.remove_edge(source, target)
-    
-    # Verifica se ainda existem arestas ponderadas
-    global ponderado
-    ponderado = any('weight' in data for _, _, data in G.edges(data=True))
+    if isinstance(G, GrafoCSR):
+        G.remover_aresta(source, target)
+    else:
+        G.remove_edge(source, target)
 
 def remover_vertice(G, node):
-    if node not in G.nodes:
+    if node not in G:
         raise ValueError("Vértice não existe.")
-    G.remove_node(node)
+    if isinstance(G, GrafoCSR):
+        G.remover_vertice(node)
+    else:
+        G.remove_node(node)
+
+def _armazem_da_vista(G):
+    # Grafo orientado sob a vista não orientada (to_undirected(as_view=True)),
+    # ou None se G não for uma dessas vistas
+    base = getattr(G, '_graph', None)
+    if G.is_directed() or base is None or not base.is_directed():
+        return None
+    return base
+
+def dados_aresta(G, source, target):
+    # No NetworkX devolve o próprio dicionário da aresta, para que alterações
+    # de peso feitas depois continuem visíveis em quem guardou a referência
+    if isinstance(G, GrafoCSR) or _armazem_da_vista(G) is not None:
+        peso = peso_aresta(G, source, target)
+        return {} if peso is None else {'weight': peso}
+    return G[source][target]
+
+def peso_aresta(G, source, target):
+    if isinstance(G, GrafoCSR):
+        return G.peso(source, target)
+    base = _armazem_da_vista(G)
+    if base is None:
+        return G[source][target].get('weight')
+    # Vista não orientada: a aresta pode estar guardada nos dois sentidos, e o
+    # peso é o menor deles, o mesmo qualquer que seja o sentido consultado
+    pesos = [
+        data['weight'] for data in (base.succ[source].get(target), base.succ[target].get(source))
+        if data is not None and 'weight' in data
+    ]
+    return min(pesos) if pesos else None
+
+def _arestas_com_dados(G, arestas=None):
+    # G.edges(data=True), com os dados de dados_aresta nas vistas não orientadas
+    if _armazem_da_vista(G) is None:
+        return G.edges(data=True) if arestas is None else arestas
+    return ((u, v, dados_aresta(G, u, v)) for u, v, _ in (G.edges(data=True) if arestas is None else arestas))
+
+def _arestas_incidentes(G, node):
+    # Arestas que saem ou chegam em 'node', com o auto-loop contado uma única vez
+    if isinstance(G, GrafoCSR):
+        return G.arestas_incidentes(node)
+    if G.is_directed():
+        return list(G.out_edges(node, data=True)) + [e for e in G.in_edges(node, data=True) if e[0] != node]
+    return list(_arestas_com_dados(G, G.edges(node, data=True)))
+
+class CacheResultados:
+    """LRU de resultados de algoritmos (BFS, DFS, SCC, lista de adjacência).
+
+    As chaves começam pela versão do grafo (ver EstadoGrafo.versao), então
+    um resultado nunca é reaproveitado depois que o grafo muda; as entradas
+    de versões antigas apenas saem do LRU.
+    """
+
+    def __init__(self, capacidade=32):
+        self.capacidade = capacidade
+        self._itens = OrderedDict()
+
+    def __contains__(self, chave):
+        return chave in self._itens
+
+    def obter(self, chave, calcular):
+        if chave in self._itens:
+            self._itens.move_to_end(chave)
+            return self._itens[chave]
+        valor = calcular()
+        self.guardar(chave, valor)
+        return valor
+
+    def guardar(self, chave, valor):
+        self._itens[chave] = valor
+        self._itens.move_to_end(chave)
+        while len(self._itens) > self.capacidade:
+            self._itens.popitem(last=False)
+
+    def valores(self):
+        return self._itens.values()
+
+    def __len__(self):
+        return len(self._itens)
+
+class EstadoGrafo:
+    """Grafo do aplicativo com contadores atualizados a cada alteração.
+
+    Manter o número de arestas e de arestas ponderadas evita percorrer todas
+    as arestas para descobrir se o grafo é ponderado ou orientado. Todas as
+    alterações do grafo devem passar pelos métodos desta classe, que também
+    mantêm 'elementos' (CacheElementos) e 'scc' (ComponentesDinamicas)
+    sincronizados com o grafo e incrementam 'versao', que invalida os
+    resultados memorizados.
+
+    As arestas ficam sempre em um grafo orientado ('armazem'). No modo não
+    orientado, 'G' é uma vista sobre ele (to_undirected(as_view=True)): a
+    orientação original é preservada sem uma segunda cópia das arestas, e
+    alternar entre os modos não copia o grafo.
+    """
+
+    def __init__(self, G=None):
+        # Id da tarefa em segundo plano da sessão (ver tarefas.py), se houver
+        self.tarefa = None
+        self.versao = 0
+        self.resultados = CacheResultados()
+        self.scc = ComponentesDinamicas()
+        # Posições dos vértices, mantidas ao converter o grafo (orientado, ponderado)
+        self.posicoes = Posicoes()
+        self.trocar_grafo(nx.DiGraph() if G is None else G)
+
+    def __getstate__(self):
+        # Gravado em disco pelas sessões (ver sessoes.BackendDisco) sem os
+        # caches, que são refeitos a partir do grafo
+        estado = self.__dict__.copy()
+        for cache in ('resultados', 'scc', 'elementos'):
+            del estado[cache]
+        return estado
+
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        self.resultados = CacheResultados()
+        self.scc = ComponentesDinamicas()
+        self.elementos = CacheElementos(self.G, self.posicoes)
+
+    def chave_resultado(self, algoritmo, *params):
+        return (self.versao, algoritmo, *params)
+
+    def memorizar(self, algoritmo, calcular, *params):
+        # Resultado de calcular() para a versão atual do grafo, calculado só uma vez
+        return self.resultados.obter(self.chave_resultado(algoritmo, *params), calcular)
+
+    def trocar_grafo(self, G):
+        # Grafo novo (carregado ou convertido de CSR). Um grafo não orientado é
+        # guardado como orientado, com cada aresta no sentido em que foi listada
+        if G.is_directed():
+            self.armazem = G
+        else:
+            self.armazem = nx.DiGraph()
+            self.armazem.add_nodes_from(G.nodes(data=True))
+            self.armazem.add_edges_from(G.edges(data=True))
+        self._exibir(G if G.is_directed() else self.armazem.to_undirected(as_view=True))
+
+    def definir_orientacao(self, orientado):
+        # Alterna entre o armazém orientado e a vista não orientada sobre ele.
+        # O GrafoCSR não tem vista não orientada: passa antes para o NetworkX
+        if not orientado and isinstance(self.armazem, GrafoCSR):
+            self.armazem = self.armazem.para_networkx()
+        self._exibir(self.armazem if orientado else self.armazem.to_undirected(as_view=True))
+
+    def _exibir(self, G):
+        # Única varredura completa: ao carregar o grafo ou trocar a orientação
+        self.versao += 1
+        self.G = G
+        self.num_arestas = 0
+        self.arestas_ponderadas = 0
+        for _, _, data in _arestas_com_dados(G):
+            self.num_arestas += 1
+            if 'weight' in data:
+                self.arestas_ponderadas += 1
+        self.elementos = CacheElementos(G, self.posicoes)
+        self.scc.invalidar()
+        # Representantes dos grupos expandidos no modo resumo (ver resumo.py)
+        self.expandidos = set()
+
+    def _orientacao_aresta(self, source, target):
+        # Em grafos não orientados a aresta pode estar no cache no sentido inverso
+        if not self.G.is_directed() and ('aresta', str(source), str(target)) not in self.elementos \
+                and ('aresta', str(target), str(source)) in self.elementos:
+            return target, source
+        return source, target
 
+    def _atualizar_elemento_aresta(self, source, target):
+        source, target = self._orientacao_aresta(source, target)
+        data = dados_aresta(self.G, source, target)
+        self.elementos.definir(('aresta', str(source), str(target)),
+                               elemento_aresta(source, target, data, self.G.is_directed()))
 
-def gerar_elementos_cytoscape(G):
-    elements = []
+    def _remover_elemento_aresta(self, source, target):
+        source, target = self._orientacao_aresta(source, target)
+        self.elementos.remover(('aresta', str(source), str(target)))
+
+    def _sentidos(self, source, target):
+        # Arestas do armazém que formam a aresta (source, target) de G: na vista
+        # não orientada, podem ser as dos dois sentidos
+        if self.G.is_directed():
+            return [(source, target)]
+        sentidos = [(source, target)] if self.armazem.has_edge(source, target) else []
+        if source != target and self.armazem.has_edge(target, source):
+            sentidos.append((target, source))
+        return sentidos
+
+    @property
+    def ponderado(self):
+        return self.arestas_ponderadas > 0
+
+    @property
+    def orientado(self):
+        return self.num_arestas > 0 and self.G.is_directed()
+
+    def adicionar_vertice(self, node):
+        self.versao += 1
+        adicionar_vertice(self.armazem, node)
+        self.scc.adicionar_vertice(node)
+        if ('no', str(node)) not in self.elementos:
+            self.elementos.definir(('no', str(node)), elemento_no(node, self.posicoes.posicionar_vertice(node)))
+
+    def adicionar_aresta(self, source, target, weight=None):
+        existia = self.G.has_edge(source, target)
+        tinha_peso = existia and peso_aresta(self.G, source, target) is not None
+
+        for u, v in self._sentidos(source, target) or [(source, target)]:
+            adicionar_aresta(self.armazem, u, v, weight)
+        self.versao += 1
+
+        if not existia:
+            self.num_arestas += 1
+            self.scc.adicionar_aresta(self.G, source, target)
+        if weight is not None and not tinha_peso:
+            self.arestas_ponderadas += 1
+        self._atualizar_elemento_aresta(source, target)
+
+    def remover_aresta(self, source, target):
+        tinha_peso = self.G.has_edge(source, target) and peso_aresta(self.G, source, target) is not None
+        for u, v in self._sentidos(source, target) or [(source, target)]:
+            remover_aresta(self.armazem, u, v)
+        self.versao += 1
+        self.scc.remover_aresta(self.G, source, target)
+        self.num_arestas -= 1
+        if tinha_peso:
+            self.arestas_ponderadas -= 1
+        self._remover_elemento_aresta(source, target)
+
+    def remover_vertice(self, node):
+        incidentes = _arestas_incidentes(self.G, node) if node in self.G else []
+        for u, v, _ in incidentes:
+            self._remover_elemento_aresta(u, v)
+        remover_vertice(self.armazem, node)
+        self.versao += 1
+        self.posicoes.remover(node)
+        self.scc.remover_vertice(self.G, node)
+        self.num_arestas -= len(incidentes)
+        self.arestas_ponderadas -= sum(1 for _, _, data in incidentes if 'weight' in data)
+        self.elementos.remover(('no', str(node)))
+
+    def definir_peso(self, source, target, weight):
+        if not self.G.has_edge(source, target):
+            raise ValueError("Aresta não existe.")
+        if peso_aresta(self.G, source, target) is None:
+            self.arestas_ponderadas += 1
+        for u, v in self._sentidos(source, target):
+            adicionar_aresta(self.armazem, u, v, float(weight))
+        self.versao += 1
+        self._atualizar_elemento_aresta(source, target)
+
+    def tornar_ponderado(self, peso_padrao=1.0):
+        if isinstance(self.armazem, GrafoCSR):
+            # Os dicionários de GrafoCSR.edges() são cópias: altera o vetor de pesos
+            self.armazem.pesos[np.isnan(self.armazem.pesos)] = float(peso_padrao)
+        else:
+            for _, _, data in self.armazem.edges(data=True):
+                data.setdefault('weight', peso_padrao)
+        self.arestas_ponderadas = self.num_arestas
+        self.versao += 1
+        self.elementos.reconstruir(self.G)
+
+    def remover_pesos(self):
+        if isinstance(self.armazem, GrafoCSR):
+            self.armazem.pesos = np.full(self.armazem.indices.size, np.nan)
+        else:
+            for _, _, data in self.armazem.edges(data=True):
+                data.pop('weight', None)
+        self.arestas_ponderadas = 0
+        self.versao += 1
+        self.elementos.reconstruir(self.G)
+
+    def limpar(self):
+        if isinstance(self.armazem, GrafoCSR):
+            self.armazem = self.G = GrafoCSR([], [0], [], [])
+        else:
+            self.armazem.clear()  # A vista não orientada, se houver, também fica vazia
+        self.versao += 1
+        self.posicoes.limpar()
+        self.num_arestas = 0
+        self.arestas_ponderadas = 0
+        self.scc.invalidar()
+        self.elementos.reconstruir(self.G)
+
+@metricas.cronometrado
+def bfs_arestas(G, source):
+    if isinstance(G, GrafoCSR):
+        return G.bfs_arestas(source)
+    return list(nx.bfs_edges(G, source=source))
+
+@metricas.cronometrado
+def dfs_arestas(G, source):
+    if isinstance(G, GrafoCSR):
+        return G.dfs_arestas(source)
+    return list(nx.dfs_edges(G, source=source))
+
+def vizinhos(G, node):
+    if isinstance(G, GrafoCSR):
+        return G.successors(node)
+    return iter(G.adj[node])
+
+@metricas.cronometrado
+def pagina_adjacencia(G, inicio, fim):
+    # Linhas da lista de adjacência apenas dos vértices da página: só eles
+    # têm os vizinhos ordenados e enviados ao navegador
+    return [
+        {'vertice': str(node), 'vizinhos': ', '.join(map(str, sorted(vizinhos(G, node))))}
+        for node in islice(G.nodes(), inicio, fim)
+    ]
+
+
+# Estilo compartilhado por todas as arestas: evita um dicionário novo por aresta
+ESTILO_ARESTA_ORIENTADA = {'target-arrow-shape': 'triangle', 'arrow-scale': 1.2}
+ESTILO_ARESTA_NAO_ORIENTADA = {'target-arrow-shape': 'none', 'arrow-scale': 1.2}
+
+def elemento_no(node, posicao=None):
+    element = {
+        'data': {'id': str(node), 'label': str(node)},
+        'classes': 'node'  # Classe para aplicar estilos gerais do stylesheet
+    }
+    if posicao is not None:
+        element['position'] = posicao  # Layout 'preset' (ver posicoes.py)
+    return element
+
+def elemento_aresta(source, target, data, orientado):
+    label = data.get('weight', '')
+    return {
+        'data': {
+            'source': str(source),
+            'target': str(target),
+            'label': str(label) if label else ''
+        },
+        'classes': 'edge',  # Classe para aplicar estilos gerais do stylesheet
+        # Define a seta dependendo se o grafo é direcionado ou não
+        'style': ESTILO_ARESTA_ORIENTADA if orientado else ESTILO_ARESTA_NAO_ORIENTADA,
+    }
+
+@metricas.cronometrado
+def gerar_elementos_cytoscape(G, posicoes=None):
+    # Com 'posicoes' (Posicoes), cada nó recebe a sua posição no layout
+    orientado = G.is_directed()
 
     # Adicionar os nós
-    for node in G.nodes():
-        elements.append({
-            'data': {'id': str(node), 'label': str(node)},
-            'classes': 'node'  # Classe para aplicar estilos gerais do stylesheet
-        })
+    elements = [elemento_no(node) for node in G.nodes()]
 
     # Adicionar as arestas
-    for edge in G.edges(data=True):
-        source, target, data = edge
-        label = data.get('weight', '')
-
-        # Defina a forma da seta dependendo se o grafo é direcionado ou não
-        target_arrow_shape = 'triangle' if G.is_directed() else 'none'
-
-        elements.append({
-            'data': {
-                'source': str(source),
-                'target': str(target),
-                'label': str(label) if label else ''
-            },
-            'classes': 'edge',  # Classe para aplicar estilos gerais do stylesheet
-            'style': {
-                'target-arrow-shape': target_arrow_shape, # Define a seta condicionalmente
-                'arrow-scale': 1.2,  
-            }
-        })
+    elements.extend(elemento_aresta(source, target, data, orientado) for source, target, data in _arestas_com_dados(G))
 
+    if posicoes is not None:
+        posicoes.posicionar_elementos(elements)
     return elements
 
+def chave_elemento(elemento):
+    data = elemento['data']
+    if 'source' in data:
+        return ('aresta', data['source'], data['target'])
+    return ('no', data['id'])
+
+class CacheElementos:
+    """Espelho da lista de elementos que está no navegador.
+
+    Cada elemento é indexado pela identidade do nó ou da aresta, e cada
+    alteração é registrada como uma operação sobre a lista ('definir' um
+    índice, 'acrescentar' ou 'remover' o último), para que o cliente receba
+    apenas o que mudou. A remoção troca o elemento com o último da lista,
+    mantendo tudo em O(1). A lista só é gerada quando o cliente precisa dela
+    (ver completa()): grafos exibidos em modo resumo nunca a materializam.
+    """
+
+    def __init__(self, G=None, posicoes=None):
+        self.posicoes = posicoes
+        self.reconstruir(G)
+
+    def reconstruir(self, G):
+        self._G = G
+        self.lista = None
+        self.posicao = {}
+        # None indica que o cliente precisa receber a lista completa
+        self.operacoes = None
+
+    def completa(self):
+        # Cópia da lista completa, gerada a partir do grafo se ainda não existir
+        if self.lista is None:
+            self.lista = gerar_elementos_cytoscape(self._G, self.posicoes) if self._G is not None else []
+            self.posicao = {chave_elemento(e): i for i, e in enumerate(self.lista)}
+        return list(self.lista)
+
+    def invalidar(self):
+        # O cliente recebeu uma lista diferente do espelho (ex.: colorida por um algoritmo)
+        self.operacoes = None
+
+    def __contains__(self, chave):
+        return chave in self.posicao
+
+    def definir(self, chave, elemento):
+        if self.lista is None:
+            return  # Será gerada já com a alteração
+        if chave in self.posicao:
+            i = self.posicao[chave]
+            self.lista[i] = elemento
+            self._registrar(('definir', i, elemento))
+        else:
+            self.posicao[chave] = len(self.lista)
+            self.lista.append(elemento)
+            self._registrar(('acrescentar', None, elemento))
+
+    def remover(self, chave):
+        if self.lista is None:
+            return
+        i = self.posicao.pop(chave, None)
+        if i is None:
+            return
+        ultimo = self.lista.pop()
+        if i < len(self.lista):
+            self.lista[i] = ultimo
+            self.posicao[chave_elemento(ultimo)] = i
+            self._registrar(('definir', i, ultimo))
+        self._registrar(('remover', len(self.lista), None))
 
+    def _registrar(self, operacao):
+        if self.operacoes is not None:
+            self.operacoes.append(operacao)
 
+    def alteracoes(self):
+        """Devolve as operações pendentes, ou None se o cliente precisa da lista completa."""
+        operacoes = self.operacoes
+        self.operacoes = []
+        return operacoes
@@ -0,0 +1,244 @@
+# Instrumentação para achar os trechos lentos em produção: cada etapa dos
+# callbacks (e as funções de graph_logic) é cronometrada em um histograma,
+# exposto no formato texto do Prometheus pela rota /metrics do servidor.
+# Com GRAFO_PERFIL=cprofile (ou pyinstrument) cada requisição de callback
+# também grava o seu perfil em GRAFO_PERFIL_DIR.
+
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Limites superiores (em segundos) das faixas dos histogramas
+FAIXAS_TEMPO = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Limites (em bytes) das faixas do tamanho das respostas
+FAIXAS_BYTES = (1 << 10, 1 << 14, 1 << 17, 1 << 20, 1 << 23, 1 << 26)
+
+PERFIL = os.environ.get('GRAFO_PERFIL', '').lower()  # '', 'cprofile' ou 'pyinstrument'
+DIRETORIO_PERFIL = os.environ.get('GRAFO_PERFIL_DIR', 'perfis')
+
+
+class Histograma:
+    def __init__(self, faixas):
+        self.faixas = faixas
+        self.contagens = [0] * (len(faixas) + 1)  # A última faixa é +Inf
+        self.soma = 0.0
+        self.total = 0
+
+    def observar(self, valor):
+        i = 0
+        while i < len(self.faixas) and valor > self.faixas[i]:
+            i += 1
+        self.contagens[i] += 1
+        self.soma += valor
+        self.total += 1
+
+
+class Metricas:
+    """Contadores e histogramas nomeados, com rótulos, seguros entre threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._contadores = {}  # (nome, rótulos) -> valor
+        self._histogramas = {}  # (nome, rótulos) -> Histograma
+        self._descricoes = {}
+
+    def descrever(self, nome, descricao):
+        self._descricoes[nome] = descricao
+
+    def incrementar(self, nome, valor=1, **rotulos):
+        chave = (nome, tuple(sorted(rotulos.items())))
+        with self._lock:
+            self._contadores[chave] = self._contadores.get(chave, 0) + valor
+
+    def observar(self, nome, valor, faixas=FAIXAS_TEMPO, **rotulos):
+        chave = (nome, tuple(sorted(rotulos.items())))
+        with self._lock:
+            histograma = self._histogramas.get(chave)
+            if histograma is None:
+                histograma = self._histogramas[chave] = Histograma(faixas)
+            histograma.observar(valor)
+
+    @contextmanager
+    def etapa(self, nome, **rotulos):
+        # Cronometra o bloco em grafo_etapa_segundos{etapa=nome, ...}
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar('grafo_etapa_segundos', time.perf_counter() - inicio, etapa=nome, **rotulos)
+
+    def cronometrado(self, funcao):
+        # Decorador: cronometra cada chamada em grafo_funcao_segundos{funcao=...}
+        @functools.wraps(funcao)
+        def envoltorio(*args, **kwargs):
+            inicio = time.perf_counter()
+            try:
+                return funcao(*args, **kwargs)
+            finally:
+                self.observar('grafo_funcao_segundos', time.perf_counter() - inicio, funcao=funcao.__name__)
+        return envoltorio
+
+    def limpar(self):
+        with self._lock:
+            self._contadores.clear()
+            self._histogramas.clear()
+
+    def texto(self):
+        # Formato de exposição texto do Prometheus
+        def formatar(rotulos, extra=()):
+            pares = [*rotulos, *extra]
+            if not pares:
+                return ''
+            return '{' + ','.join(f'{k}="{_escapar(v)}"' for k, v in pares) + '}'
+
+        with self._lock:
+            contadores = sorted(self._contadores.items())
+            histogramas = sorted(
+                ((chave, (list(h.contagens), h.soma, h.total, h.faixas)) for chave, h in self._histogramas.items()),
+                key=lambda item: item[0],
+            )
+
+        linhas = []
+        anterior = None
+        for (nome, rotulos), valor in contadores:
+            if nome != anterior:
+                linhas += self._cabecalho(nome, 'counter')
+                anterior = nome
+            linhas.append(f"{nome}{formatar(rotulos)} {valor}")
+
+        for (nome, rotulos), (contagens, soma, total, faixas) in histogramas:
+            if nome != anterior:
+                linhas += self._cabecalho(nome, 'histogram')
+                anterior = nome
+            acumulado = 0
+            for limite, contagem in zip((*map(repr, faixas), '+Inf'), contagens):
+                acumulado += contagem
+                linhas.append(f"{nome}_bucket{formatar(rotulos, [('le', limite)])} {acumulado}")
+            linhas.append(f"{nome}_sum{formatar(rotulos)} {soma}")
+            linhas.append(f"{nome}_count{formatar(rotulos)} {total}")
+        return '\n'.join(linhas) + '\n'
+
+    def _cabecalho(self, nome, tipo):
+        linhas = [f"# HELP {nome} {self._descricoes[nome]}"] if nome in self._descricoes else []
+        return linhas + [f"# TYPE {nome} {tipo}"]
+
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+# Instância usada pelo servidor e por graph_logic
+metricas = Metricas()
+metricas.descrever('grafo_etapa_segundos', "Duração de cada etapa dos callbacks")
+metricas.descrever('grafo_funcao_segundos', "Duração das funções de graph_logic")
+metricas.descrever('grafo_callback_segundos', "Duração do corpo de cada callback do Dash")
+metricas.descrever('grafo_serializacao_segundos', "Requisição de callback menos o corpo do callback (serialização JSON e Dash)")
+metricas.descrever('grafo_requisicao_segundos', "Duração total das requisições HTTP")
+metricas.descrever('grafo_resposta_bytes', "Tamanho das respostas HTTP")
+metricas.descrever('grafo_requisicoes_total', "Requisições HTTP atendidas")
+metricas.descrever('grafo_erros_total', "Exceções levantadas pelos callbacks")
+
+#####################################################
+##################### PERFIL ########################
+#####################################################
+
+@contextmanager
+def perfil(nome, modo=None, diretorio=None):
+    # Grava o perfil do bloco em 'diretorio' (cprofile: .prof para pstats ou
+    # snakeviz; pyinstrument: .html). Sem modo configurado, não faz nada.
+    modo = PERFIL if modo is None else modo
+    if not modo:
+        yield
+        return
+
+    diretorio = diretorio or DIRETORIO_PERFIL
+    os.makedirs(diretorio, exist_ok=True)
+    base = os.path.join(diretorio, f"{time.strftime('%Y%m%d-%H%M%S')}-{nome}-{time.perf_counter_ns() % 10**9}")
+
+    if modo == 'pyinstrument':
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            raise ValueError("GRAFO_PERFIL=pyinstrument requer o pacote pyinstrument instalado.")
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            with open(base + '.html', 'w') as f:
+                f.write(profiler.output_html())
+    elif modo == 'cprofile':
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            profiler.dump_stats(base + '.prof')
+    else:
+        raise ValueError(f"Modo de perfil desconhecido: '{modo}' (use cprofile ou pyinstrument).")
+
+
+def instrumentar_callback(funcao):
+    # Decorador para callbacks do Dash: cronometra o corpo, conta as exceções,
+    # grava o perfil (se configurado) e deixa a duração disponível para o
+    # servidor estimar o tempo de serialização (ver registrar_rotas)
+    @functools.wraps(funcao)
+    def envoltorio(*args, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            with perfil(funcao.__name__):
+                return funcao(*args, **kwargs)
+        except Exception:
+            metricas.incrementar('grafo_erros_total', callback=funcao.__name__)
+            raise
+        finally:
+            duracao = time.perf_counter() - inicio
+            metricas.observar('grafo_callback_segundos', duracao, callback=funcao.__name__)
+            _guardar_duracao_callback(funcao.__name__, duracao)
+    return envoltorio
+
+
+def _guardar_duracao_callback(nome, duracao):
+    try:
+        from flask import g, has_request_context
+    except ImportError:
+        return
+    if has_request_context():
+        g.grafo_callback = (nome, duracao)
+
+
+def registrar_rotas(server, caminho='/metrics'):
+    """Expõe as métricas em 'caminho' e cronometra as requisições do servidor Flask."""
+    from flask import Response, g, request
+
+    @server.before_request
+    def _iniciar_requisicao():
+        g.grafo_inicio = time.perf_counter()
+
+    @server.after_request
+    def _finalizar_requisicao(response):
+        inicio = g.pop('grafo_inicio', None)
+        if inicio is None or request.path == caminho:
+            return response
+        duracao = time.perf_counter() - inicio
+        rota = request.url_rule.rule if request.url_rule is not None else 'desconhecida'
+        metricas.observar('grafo_requisicao_segundos', duracao, rota=rota)
+        metricas.incrementar('grafo_requisicoes_total', rota=rota, status=response.status_code)
+        if not response.direct_passthrough:
+            metricas.observar('grafo_resposta_bytes', response.calculate_content_length() or 0,
+                              faixas=FAIXAS_BYTES, rota=rota)
+
+        callback = g.pop('grafo_callback', None)
+        if callback is not None:
+            nome, duracao_callback = callback
+            metricas.observar('grafo_serializacao_segundos', max(duracao - duracao_callback, 0.0), callback=nome)
+        return response
+
+    @server.route(caminho)
+    def _metricas():
+        return Response(metricas.texto(), mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,141 @@
+# Layout calculado no servidor: cada vértice recebe uma posição fixa, guardada
+# entre as respostas, e o Cytoscape usa o layout 'preset'. Só os vértices
+# novos são posicionados, então o grafo não "pula" a cada alteração.
+
+import numpy as np
+
+DISTANCIA_IDEAL = 80.0  # Comprimento ideal das arestas, em pixels do Cytoscape
+ITERACOES = 40
+GRAVIDADE = 0.5  # Puxa os vértices para o centro, aproximando componentes desconexas
+TAMANHO_BLOCO = 256  # Vértices por bloco no cálculo da repulsão (limita a memória)
+
+
+def layout_forcas(pos, moveis, origem, destino, iteracoes=ITERACOES, k=DISTANCIA_IDEAL):
+    """Fruchterman-Reingold vetorizado com NumPy.
+
+    'pos' (n x 2) é atualizado no lugar, mas só nos vértices com moveis[i]
+    verdadeiro: os demais atuam como âncoras. 'origem' e 'destino' são os
+    índices dos extremos de cada aresta.
+    """
+    moveis = np.flatnonzero(moveis)
+    if moveis.size == 0:
+        return pos
+
+    # Deslocamento máximo por iteração, reduzido linearmente
+    temperatura = k * (1.0 + 0.2 * np.sqrt(moveis.size))
+    resfriamento = temperatura / (iteracoes + 1)
+    for _ in range(iteracoes):
+        deslocamento = np.empty((moveis.size, 2))
+        # Precisão simples na repulsão, a parte quadrática do cálculo
+        x = pos[:, 0].astype(np.float32)
+        y = pos[:, 1].astype(np.float32)
+
+        # Repulsão k²/d entre cada vértice móvel e todos os outros, em blocos
+        for inicio in range(0, moveis.size, TAMANHO_BLOCO):
+            bloco = moveis[inicio:inicio + TAMANHO_BLOCO]
+            dx = x[bloco, None] - x[None, :]
+            dy = y[bloco, None] - y[None, :]
+            fator = dx * dx
+            fator += dy * dy
+            np.maximum(fator, np.float32(1e-2), out=fator)
+            np.divide(np.float32(k * k), fator, out=fator)
+            deslocamento[inicio:inicio + bloco.size, 0] = np.einsum('ij,ij->i', dx, fator)
+            deslocamento[inicio:inicio + bloco.size, 1] = np.einsum('ij,ij->i', dy, fator)
+
+        # Atração d²/k ao longo das arestas
+        if origem.size:
+            delta = pos[origem] - pos[destino]
+            forca = delta * (np.sqrt(np.einsum('ij,ij->i', delta, delta)) / k)[:, None]
+            atracao = np.zeros_like(pos)
+            np.add.at(atracao, origem, -forca)
+            np.add.at(atracao, destino, forca)
+            deslocamento += atracao[moveis]
+
+        deslocamento -= GRAVIDADE * (pos[moveis] - pos.mean(axis=0))
+
+        comprimento = np.sqrt(np.einsum('ij,ij->i', deslocamento, deslocamento))[:, None]
+        pos[moveis] += deslocamento / np.maximum(comprimento, 1e-9) * np.minimum(comprimento, temperatura)
+        temperatura -= resfriamento
+
+    return pos
+
+
+class Posicoes:
+    """Posição de cada vértice (pelo id do elemento no Cytoscape).
+
+    Vértices novos começam no centro dos vizinhos já posicionados (ou em um
+    ponto livre perto do grafo) e são ajustados pelo layout de forças com os
+    vértices antigos parados.
+    """
+
+    def __init__(self, semente=0):
+        self.xy = {}  # id do vértice -> (x, y)
+        self._rng = np.random.default_rng(semente)
+
+    def limpar(self):
+        self.xy.clear()
+
+    def remover(self, rotulo):
+        self.xy.pop(str(rotulo), None)
+
+    def _pontos_livres(self, quantidade):
+        # Pontos aleatórios em um disco ao redor do grafo já posicionado
+        if self.xy:
+            centro = np.mean(np.array(list(self.xy.values())), axis=0)
+        else:
+            centro = np.zeros(2)
+        raio = DISTANCIA_IDEAL * np.sqrt(len(self.xy) + quantidade)
+        angulo = self._rng.uniform(0, 2 * np.pi, quantidade)
+        distancia = raio * np.sqrt(self._rng.uniform(0, 1, quantidade))
+        return centro + np.column_stack([np.cos(angulo), np.sin(angulo)]) * distancia[:, None]
+
+    def posicionar_vertice(self, rotulo):
+        # Vértice isolado recém-criado: um ponto livre, sem recalcular o layout
+        chave = str(rotulo)
+        if chave not in self.xy:
+            x, y = self._pontos_livres(1)[0]
+            self.xy[chave] = (float(x), float(y))
+        x, y = self.xy[chave]
+        return {'x': x, 'y': y}
+
+    def posicionar_elementos(self, elements):
+        # Define 'position' em cada nó da lista, calculando só os que faltam
+        nos = [element for element in elements if 'source' not in element['data']]
+        ids = [element['data']['id'] for element in nos]
+        faltando = [i for i, chave in enumerate(ids) if chave not in self.xy]
+
+        if faltando:
+            indice = {chave: i for i, chave in enumerate(ids)}
+            pares = [
+                (indice[element['data']['source']], indice[element['data']['target']])
+                for element in elements
+                if 'source' in element['data']
+                and element['data']['source'] in indice and element['data']['target'] in indice
+            ]
+            origem, destino = (np.array(pares, dtype=np.int64).T if pares
+                               else (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)))
+
+            pos = np.array([self.xy.get(chave, (np.nan, np.nan)) for chave in ids], dtype=np.float64)
+            moveis = np.isnan(pos[:, 0])
+
+            # Posição inicial: centro dos vizinhos já posicionados, com uma pequena perturbação
+            soma = np.zeros_like(pos)
+            vizinhos = np.zeros(len(ids))
+            for a, b in ((origem, destino), (destino, origem)):
+                fixo = ~moveis[b]
+                np.add.at(soma, a[fixo], pos[b[fixo]])
+                np.add.at(vizinhos, a[fixo], 1)
+            com_vizinhos = moveis & (vizinhos > 0)
+            pos[com_vizinhos] = soma[com_vizinhos] / vizinhos[com_vizinhos, None] \
+                + self._rng.normal(0, DISTANCIA_IDEAL / 4, (int(com_vizinhos.sum()), 2))
+            isolados = moveis & (vizinhos == 0)
+            pos[isolados] = self._pontos_livres(int(isolados.sum()))
+
+            layout_forcas(pos, moveis, origem, destino)
+            for i in faltando:
+                self.xy[ids[i]] = (float(pos[i, 0]), float(pos[i, 1]))
+
+        for element, chave in zip(nos, ids):
+            x, y = self.xy[chave]
+            element['position'] = {'x': x, 'y': y}
+        return elements
@@ -0,0 +1,103 @@
+# Modo resumo (nível de detalhe) para grafos grandes: em vez de enviar todos
+# os vértices e arestas ao Cytoscape, cada grupo de vértices (componente
+# fortemente conexa, ou faixa de componentes quando há muitas) vira um único
+# super-nó, e as arestas entre grupos são agregadas com a sua contagem.
+# Grupos expandidos pelo usuário aparecem com os seus vértices.
+
+from itertools import chain
+
+import numpy as np
+
+from grafo_csr import GrafoCSR
+from graph_logic import (
+    dados_aresta, elemento_no, elemento_aresta,
+    ESTILO_ARESTA_ORIENTADA, ESTILO_ARESTA_NAO_ORIENTADA,
+)
+
+
+def agrupar_vertices(componente, max_grupos):
+    # Grupo de cada vértice: a própria componente ou, se houver mais de
+    # 'max_grupos', faixas consecutivas de componentes (o Tarjan numera as
+    # componentes em ordem topológica reversa, então as faixas ficam próximas)
+    num_componentes = int(componente.max()) + 1 if componente.size else 0
+    if num_componentes <= max_grupos:
+        return componente
+    return (componente.astype(np.int64) * max_grupos // num_componentes).astype(np.int32)
+
+
+def _arestas_indices(G, ids):
+    # Origem e destino de cada aresta como ids de vértice (na ordem de 'ids')
+    if isinstance(G, GrafoCSR):
+        origem = np.repeat(np.arange(len(G.rotulos)), np.diff(G.offsets))
+        return origem, G.indices.astype(np.int64)
+    pares = np.fromiter(
+        chain.from_iterable((ids[u], ids[v]) for u, v in G.edges()),
+        dtype=np.int64, count=2 * G.number_of_edges(),
+    )
+    return pares[0::2], pares[1::2]
+
+
+def gerar_elementos_resumo(G, rotulos, grupo, expandidos, orientado):
+    """Elementos do Cytoscape com os grupos recolhidos em super-nós.
+
+    'rotulos' e 'grupo' vêm de componentes_grafo/agrupar_vertices, e
+    'expandidos' contém o representante (primeiro vértice) dos grupos que
+    devem ser exibidos vértice a vértice.
+    """
+    n = len(rotulos)
+    ids = {rotulo: i for i, rotulo in enumerate(rotulos)}
+    _, primeiros, tamanhos = np.unique(grupo, return_index=True, return_counts=True)
+
+    # Grupos com um único vértice são sempre exibidos como o próprio vértice
+    aberto = tamanhos == 1
+    for representante in expandidos:
+        i = ids.get(representante)
+        if i is not None:
+            aberto[grupo[i]] = True
+
+    # Elemento visível de cada vértice: ele mesmo (id >= 0) ou o super-nó do seu grupo (-(grupo + 1))
+    visivel = np.where(aberto[grupo], np.arange(n), -(grupo.astype(np.int64) + 1))
+
+    def nome(v):
+        return str(rotulos[v]) if v >= 0 else f"grupo:{rotulos[primeiros[-v - 1]]}"
+
+    elements = [elemento_no(rotulos[i]) for i in np.flatnonzero(aberto[grupo]).tolist()]
+    elements.extend(
+        {
+            'data': {
+                'id': nome(-(g + 1)),
+                'label': f"{tamanhos[g]} vértices",
+                'representante': str(rotulos[primeiros[g]]),
+                'tamanho': int(tamanhos[g]),
+            },
+            'classes': 'grupo',
+        }
+        for g in np.flatnonzero(~aberto).tolist()
+    )
+
+    origem, destino = _arestas_indices(G, ids)
+    a, b = visivel[origem], visivel[destino]
+    # Arestas internas a um grupo recolhido desaparecem dentro do super-nó
+    manter = ~((a == b) & (a < 0))
+    a, b = a[manter], b[manter]
+    if not orientado:
+        a, b = np.minimum(a, b), np.maximum(a, b)
+    pares, contagens = np.unique(np.stack([a, b], axis=1), axis=0, return_counts=True) \
+        if a.size else (np.empty((0, 2), dtype=np.int64), np.empty(0, dtype=np.int64))
+
+    estilo = ESTILO_ARESTA_ORIENTADA if orientado else ESTILO_ARESTA_NAO_ORIENTADA
+    for (u, v), contagem in zip(pares.tolist(), contagens.tolist()):
+        if u >= 0 and v >= 0:
+            # Aresta entre vértices visíveis: igual à do modo completo
+            source, target = rotulos[u], rotulos[v]
+            if not G.has_edge(source, target):
+                source, target = target, source  # Não orientado, guardada no sentido inverso
+            elements.append(elemento_aresta(source, target, dados_aresta(G, source, target), orientado))
+        else:
+            elements.append({
+                'data': {'source': nome(u), 'target': nome(v), 'label': str(contagem) if contagem > 1 else ''},
+                'classes': 'edge',
+                'style': estilo,
+            })
+
+    return elements
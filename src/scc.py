@@ -0,0 +1,286 @@
+import numpy as np
+
+from grafo_csr import GrafoCSR, INTERVALO_PROGRESSO
+
+
+def tarjan(offsets, indices, progresso=None):
+    """Componentes fortemente conexas pelo algoritmo de Tarjan, sem recursão.
+
+    Recebe o grafo em CSR (sucessores de v em indices[offsets[v]:offsets[v + 1]])
+    e devolve um vetor com o id da componente de cada vértice. As componentes
+    são numeradas na ordem em que o Tarjan recursivo as encontraria. O
+    callback opcional 'progresso(visitados, total)' é chamado periodicamente.
+    """
+    n = len(offsets) - 1
+    offsets = np.asarray(offsets).tolist()
+    indices = np.asarray(indices).tolist()
+
+    indexes = [-1] * n  # Índice de descoberta de cada vértice
+    lowlink = [0] * n  # Menor índice alcançável a partir de cada vértice
+    on_stack = bytearray(n)
+    componente = np.empty(n, dtype=np.int32)
+
+    stack = []  # Pilha de vértices do Tarjan
+    index = 0
+    num_componentes = 0
+
+    for raiz in range(n):
+        if indexes[raiz] != -1:
+            continue
+
+        # Pilha de chamadas explícita: (vértice, posição do próximo sucessor)
+        chamadas = [(raiz, offsets[raiz])]
+        indexes[raiz] = lowlink[raiz] = index
+        index += 1
+        stack.append(raiz)
+        on_stack[raiz] = 1
+
+        while chamadas:
+            v, pos = chamadas[-1]
+            fim = offsets[v + 1]
+            desceu = False
+
+            while pos < fim:
+                w = indices[pos]
+                pos += 1
+                if indexes[w] == -1:
+                    # Equivale à chamada recursiva tarjan(w)
+                    chamadas[-1] = (v, pos)
+                    indexes[w] = lowlink[w] = index
+                    index += 1
+                    stack.append(w)
+                    on_stack[w] = 1
+                    chamadas.append((w, offsets[w]))
+                    if progresso is not None and index % INTERVALO_PROGRESSO == 0:
+                        progresso(index, n)
+                    desceu = True
+                    break
+                elif on_stack[w] and indexes[w] < lowlink[v]:
+                    lowlink[v] = indexes[w]
+
+            if desceu:
+                continue
+
+            # Todos os sucessores de v foram processados
+            chamadas.pop()
+            if lowlink[v] == indexes[v]:
+                while True:
+                    w = stack.pop()
+                    on_stack[w] = 0
+                    componente[w] = num_componentes
+                    if w == v:
+                        break
+                num_componentes += 1
+
+            if chamadas:
+                pai = chamadas[-1][0]
+                if lowlink[v] < lowlink[pai]:
+                    lowlink[pai] = lowlink[v]
+
+    return componente
+
+
+def componentes_grafo(G):
+    # Rótulos dos vértices e o id da componente de cada um
+    csr = G if isinstance(G, GrafoCSR) else GrafoCSR.de_networkx(G)
+    return csr.rotulos, tarjan(csr.offsets, csr.indices)
+
+
+def agrupar_componentes(rotulos, componente):
+    # Lista de componentes, cada uma com os rótulos dos seus vértices
+    sccs = [[] for _ in range(int(componente.max()) + 1 if componente.size else 0)]
+    for rotulo, c in zip(rotulos, componente.tolist()):
+        sccs[c].append(rotulo)
+    return sccs
+
+
+def _sccs_induzidas(G, nos):
+    # Componentes do subgrafo induzido por 'nos' (lista de listas de rótulos)
+    rotulos = list(nos)
+    ids = {rotulo: i for i, rotulo in enumerate(rotulos)}
+    offsets = [0]
+    indices = []
+    for rotulo in rotulos:
+        indices.extend(ids[w] for w in G.successors(rotulo) if w in ids)
+        offsets.append(len(indices))
+    return agrupar_componentes(rotulos, tarjan(offsets, indices))
+
+
+# Largura inicial do intervalo de ordem de cada componente (ver ComponentesDinamicas)
+ESPACO_ORDEM = 1 << 40
+
+
+class ComponentesDinamicas:
+    """Componentes fortemente conexas mantidas a cada alteração do grafo.
+
+    O Tarjan completo roda só na primeira consulta. Além das componentes, é
+    mantida uma ordem topológica do grafo das componentes: cada uma ocupa um
+    intervalo [ordem, ordem + largura) de inteiros, disjunto dos demais, e toda
+    aresta vai de um intervalo para outro posterior. Inserir a aresta (u, v):
+
+    - se a componente de v já vem depois da de u, nada muda (O(1));
+    - senão, a busca a partir de v só visita componentes que estão, na
+      ordem, entre a de v e a de u; as alcançadas vão para o fim do
+      intervalo da componente de u e, se u foi alcançado, as do ciclo
+      fechado pela aresta são unidas.
+
+    Remover uma aresta interna a uma componente recalcula apenas essa
+    componente, dividindo o seu intervalo entre as partes.
+    """
+
+    def __init__(self):
+        self.invalidar()
+
+    def invalidar(self):
+        self.componente = None  # rótulo -> id da componente
+        self.membros = None  # id da componente -> conjunto de rótulos
+        self.ordem = None  # id da componente -> início do intervalo na ordem topológica
+        self.largura = None  # id da componente -> largura do intervalo
+        self._proximo_id = 0
+        self._fim = 0  # Fim do último intervalo
+
+    @property
+    def ativo(self):
+        return self.componente is not None
+
+    def _nova(self, nos, ordem, largura):
+        c = self._proximo_id
+        self._proximo_id += 1
+        self.membros[c] = set(nos)
+        for rotulo in nos:
+            self.componente[rotulo] = c
+        self.ordem[c] = ordem
+        self.largura[c] = largura
+        self._fim = max(self._fim, ordem + largura)
+        return c
+
+    def _renumerar(self, largura):
+        # Intervalos esgotados: redistribui todos com a mesma largura, na mesma ordem
+        for posicao, c in enumerate(sorted(self.ordem, key=self.ordem.__getitem__)):
+            self.ordem[c] = posicao * largura
+            self.largura[c] = largura
+        self._fim = len(self.ordem) * largura
+
+    def _dividir(self, c, partes):
+        # Divide o intervalo de 'c' em 'partes' fatias consecutivas: (início, largura)
+        if self.largura[c] < partes:
+            # A nova largura sempre comporta as partes, mesmo acima de ESPACO_ORDEM
+            self._renumerar(max(ESPACO_ORDEM, partes))
+        fatia = self.largura[c] // partes
+        return [(self.ordem[c] + k * fatia, fatia) for k in range(partes)]
+
+    def definir(self, rotulos, componente):
+        # Parte de um resultado completo (ex.: do Tarjan em segundo plano). O
+        # Tarjan numera as componentes em ordem topológica reversa
+        self.componente = {}
+        self.membros = {}
+        self.ordem = {}
+        self.largura = {}
+        self._proximo_id = 0
+        self._fim = 0
+        sccs = agrupar_componentes(rotulos, componente)
+        for k, scc in enumerate(sccs):
+            self._nova(scc, (len(sccs) - 1 - k) * ESPACO_ORDEM, ESPACO_ORDEM)
+
+    def componentes(self, G):
+        # Mesmo formato de componentes_grafo: (rótulos, id da componente de cada um)
+        if not G.is_directed():
+            return componentes_grafo(G)
+        if not self.ativo:
+            rotulos, componente = componentes_grafo(G)
+            self.definir(rotulos, componente)
+            return rotulos, componente
+
+        rotulos = list(G.nodes())
+        ids = {}
+        componente = np.fromiter(
+            (ids.setdefault(self.componente[rotulo], len(ids)) for rotulo in rotulos),
+            dtype=np.int32, count=len(rotulos),
+        )
+        return rotulos, componente
+
+    def _remover_componente(self, c):
+        del self.ordem[c], self.largura[c]
+        return self.membros.pop(c)
+
+    def _recalcular(self, G, c):
+        # As partes saem do Tarjan em ordem topológica reversa
+        partes = _sccs_induzidas(G, self.membros[c])
+        fatias = self._dividir(c, len(partes))
+        self._remover_componente(c)
+        for scc, (ordem, largura) in zip(partes, reversed(fatias)):
+            self._nova(scc, ordem, largura)
+
+    def adicionar_vertice(self, rotulo):
+        if self.ativo and rotulo not in self.componente:
+            self._nova([rotulo], self._fim, ESPACO_ORDEM)
+
+    def adicionar_aresta(self, G, source, target):
+        # Chamado depois de inserir a aresta em G
+        if not self.ativo:
+            return
+        cs, ct = self.componente[source], self.componente[target]
+        if cs == ct or self.ordem[ct] > self.ordem[cs]:
+            return  # A ordem continua válida e não há ciclo novo
+
+        # Componentes alcançáveis a partir da de 'target' sem passar da de
+        # 'source' na ordem (as posteriores não levam a 'source'), cada uma com
+        # as componentes alcançadas que têm aresta para ela
+        componente, ordem, limite = self.componente, self.ordem, self.ordem[cs]
+        anteriores = {ct: set()}
+        fila = list(self.membros[ct])
+        for u in fila:
+            cu = componente[u]
+            for w in G.successors(u):
+                cw = componente[w]
+                if cw == cu or ordem[cw] > limite:
+                    continue
+                if cw in anteriores:
+                    anteriores[cw].add(cu)
+                else:
+                    anteriores[cw] = {cu}
+                    fila.extend(self.membros[cw])
+
+        unidas = {cs}
+        if cs in anteriores:
+            # Ciclo novo: as alcançadas que levam de volta a 'source'
+            pendentes = [cs]
+            for c in pendentes:
+                for anterior in anteriores[c] - unidas:
+                    unidas.add(anterior)
+                    pendentes.append(anterior)
+
+        # Intervalo de 'source': primeiro a sua componente (unida ao ciclo, se
+        # houver), depois as demais alcançadas, na ordem relativa que já tinham
+        movidas = sorted(anteriores.keys() - unidas, key=ordem.__getitem__)
+        fatias = self._dividir(cs, 1 + len(movidas))
+        # A maior componente do ciclo absorve as outras, sem renomear os seus vértices
+        maior = max(unidas, key=lambda c: len(self.membros[c]))
+        for c in unidas - {maior}:
+            nos = self._remover_componente(c)
+            for rotulo in nos:
+                componente[rotulo] = maior
+            self.membros[maior] |= nos
+        ordem[maior], self.largura[maior] = fatias[0]
+        for c, (inicio, largura) in zip(movidas, fatias[1:]):
+            ordem[c], self.largura[c] = inicio, largura
+
+    def remover_aresta(self, G, source, target):
+        # Chamado depois de remover a aresta de G; arestas entre componentes
+        # diferentes não alteram as componentes (nem a ordem)
+        if not self.ativo or source == target:
+            return
+        c = self.componente[source]
+        if c == self.componente[target]:
+            self._recalcular(G, c)
+
+    def remover_vertice(self, G, rotulo):
+        # Chamado depois de remover o vértice de G
+        if not self.ativo:
+            return
+        c = self.componente.pop(rotulo)
+        self.membros[c].discard(rotulo)
+        if self.membros[c]:
+            self._recalcular(G, c)
+        else:
+            self._remover_componente(c)
@@ -0,0 +1,241 @@
+import os
+import pickle
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import numpy as np
+
+from grafo_csr import GrafoCSR
+
+# Estimativa de memória usada pelo NetworkX (dicionário de dicionários)
+BYTES_POR_VERTICE_NX = 300
+BYTES_POR_ARESTA_NX = 500
+BYTES_POR_VERTICE_CSR = 100
+# Elemento do Cytoscape no espelho (CacheElementos), posição de um vértice
+# (Posicoes) e item de uma lista ou dicionário guardado em CacheResultados
+BYTES_POR_ELEMENTO = 700
+BYTES_POR_POSICAO = 150
+BYTES_POR_ITEM = 100
+
+# Formato dos ids de sessão gerados pelo servidor (uuid4().hex, ver app.criar_layout)
+FORMATO_SESSAO = re.compile(r'[0-9a-f]{32}')
+
+# Intervalo mínimo entre duas limpezas do diretório de sessões (BackendDisco)
+INTERVALO_LIMPEZA = 60
+
+
+def _tamanho_csr(G):
+    return G.offsets.nbytes + G.indices.nbytes + G.pesos.nbytes + BYTES_POR_VERTICE_CSR * G.number_of_nodes()
+
+
+def _tamanho_resultado(valor):
+    # Tuplas são resultados compostos (ex.: rótulos e componentes do SCC); o
+    # GrafoCSR é a cópia do grafo enviada às tarefas em segundo plano
+    if isinstance(valor, np.ndarray):
+        return valor.nbytes
+    if isinstance(valor, GrafoCSR):
+        return _tamanho_csr(valor)
+    if isinstance(valor, tuple):
+        return sum(map(_tamanho_resultado, valor))
+    if isinstance(valor, (list, dict, set, frozenset)):
+        return BYTES_POR_ITEM * len(valor)
+    return BYTES_POR_ITEM
+
+
+def validar_sessao(sessao):
+    # O id vem do navegador (dcc.Store): nunca confiar nele para montar caminhos
+    if not isinstance(sessao, str) or not FORMATO_SESSAO.fullmatch(sessao):
+        raise ValueError("Sessão inválida.")
+    return sessao
+
+
+def estimar_tamanho(estado):
+    # Tamanho aproximado do estado em bytes, usado para o despejo do LRU
+    G = estado.G
+    if isinstance(G, GrafoCSR):
+        tamanho = _tamanho_csr(G)
+    else:
+        tamanho = BYTES_POR_VERTICE_NX * G.number_of_nodes() + BYTES_POR_ARESTA_NX * estado.num_arestas
+    if estado.elementos.lista is not None:
+        tamanho += BYTES_POR_ELEMENTO * len(estado.elementos.lista)
+    tamanho += BYTES_POR_POSICAO * len(estado.posicoes.xy)
+    tamanho += sum(map(_tamanho_resultado, estado.resultados.valores()))
+    return tamanho
+
+
+class BackendDisco:
+    """Guarda cada sessão em um arquivo pickle dentro de 'diretorio'.
+
+    Permite que vários processos (ex.: workers do gunicorn) compartilhem as
+    sessões: cada processo recarrega a sessão quando o arquivo muda.
+
+    Sessões não gravadas há mais de 'ttl' segundos são apagadas e, se os
+    arquivos passarem de 'capacidade_bytes', as mais antigas também. A
+    limpeza roda ao gravar, no máximo uma vez a cada INTERVALO_LIMPEZA.
+    """
+
+    def __init__(self, diretorio, ttl=None, capacidade_bytes=None):
+        self.diretorio = diretorio
+        self.ttl = ttl
+        self.capacidade_bytes = capacidade_bytes
+        self._ultima_limpeza = 0.0
+        os.makedirs(diretorio, exist_ok=True)
+
+    def _caminho(self, sessao):
+        caminho = os.path.realpath(os.path.join(self.diretorio, f"{validar_sessao(sessao)}.pkl"))
+        if os.path.dirname(caminho) != os.path.realpath(self.diretorio):
+            raise ValueError("Sessão inválida.")
+        return caminho
+
+    def versao(self, sessao):
+        # Data de modificação do arquivo, ou None se a sessão não existe
+        try:
+            return os.stat(self._caminho(sessao)).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def carregar(self, sessao):
+        try:
+            with open(self._caminho(sessao), 'rb') as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+
+    def salvar(self, sessao, estado):
+        # Grava em um arquivo temporário e renomeia, para que outro processo
+        # nunca leia uma sessão pela metade
+        caminho = self._caminho(sessao)
+        temporario = f"{caminho}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+        with open(temporario, 'wb') as f:
+            pickle.dump(estado, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporario, caminho)
+        versao = self.versao(sessao)
+
+        agora = time.monotonic()
+        if agora - self._ultima_limpeza >= INTERVALO_LIMPEZA:
+            self._ultima_limpeza = agora
+            self.limpar(manter=sessao)
+        return versao
+
+    def limpar(self, manter=None):
+        # Apaga as sessões expiradas (e temporários esquecidos por um processo
+        # que morreu) e, acima da capacidade, as gravadas há mais tempo
+        if self.ttl is None and self.capacidade_bytes is None:
+            return
+        agora = time.time()
+        arquivos = []
+        with os.scandir(self.diretorio) as entradas:
+            for entrada in entradas:
+                if not entrada.name.endswith(('.pkl', '.tmp')):
+                    continue
+                try:
+                    info = entrada.stat()
+                except FileNotFoundError:
+                    continue  # Apagado por outro processo
+                if entrada.name == f"{manter}.pkl":
+                    continue
+                if self.ttl is not None and agora - info.st_mtime > self.ttl:
+                    self._apagar(entrada.path)
+                elif entrada.name.endswith('.pkl'):
+                    arquivos.append((info.st_mtime, info.st_size, entrada.path))
+
+        if self.capacidade_bytes is not None:
+            total = sum(tamanho for _, tamanho, _ in arquivos)
+            if manter is not None:
+                try:
+                    total += os.stat(self._caminho(manter)).st_size
+                except FileNotFoundError:
+                    pass
+            for _, tamanho, caminho in sorted(arquivos):
+                if total <= self.capacidade_bytes:
+                    break
+                self._apagar(caminho)
+                total -= tamanho
+
+    @staticmethod
+    def _apagar(caminho):
+        try:
+            os.remove(caminho)
+        except FileNotFoundError:
+            pass
+
+    def remover(self, sessao):
+        self._apagar(self._caminho(sessao))
+
+
+class ArmazemSessoes:
+    """Estados de grafo por sessão, em um LRU limitado pelo tamanho total.
+
+    Sem backend, as sessões despejadas são descartadas. Com um backend
+    (ex.: BackendDisco), cada sessão é gravada após as alterações e
+    recarregada quando outro processo a modificou.
+    """
+
+    def __init__(self, criar_estado, capacidade_bytes, backend=None):
+        self.criar_estado = criar_estado
+        self.capacidade_bytes = capacidade_bytes
+        self.backend = backend
+        self._sessoes = OrderedDict()  # sessao -> (estado, tamanho, versao no backend)
+        self._tamanho_total = 0
+        self._lock = threading.Lock()
+
+    def obter(self, sessao):
+        validar_sessao(sessao)
+        with self._lock:
+            entrada = self._sessoes.get(sessao)
+            if self.backend is not None:
+                versao = self.backend.versao(sessao)
+                if versao is not None and (entrada is None or entrada[2] != versao):
+                    # A sessão foi alterada por outro processo (ou despejada daqui)
+                    estado = self.backend.carregar(sessao)
+                    if estado is not None:
+                        self._guardar(sessao, estado, versao)
+                        return estado
+
+            if entrada is None:
+                estado = self.criar_estado()
+                self._guardar(sessao, estado, None)
+                return estado
+
+            self._sessoes.move_to_end(sessao)
+            return entrada[0]
+
+    def salvar(self, sessao, estado, alterado=True):
+        # Atualiza o tamanho da sessão e, se houver backend e o estado foi
+        # alterado, grava no backend
+        validar_sessao(sessao)
+        gravar = self.backend is not None and alterado
+        versao = self.backend.salvar(sessao, estado) if gravar else None
+        with self._lock:
+            if not gravar and sessao in self._sessoes:
+                versao = self._sessoes[sessao][2]  # Continua igual à do backend
+            self._guardar(sessao, estado, versao)
+
+    def remover(self, sessao):
+        validar_sessao(sessao)
+        with self._lock:
+            entrada = self._sessoes.pop(sessao, None)
+            if entrada is not None:
+                self._tamanho_total -= entrada[1]
+        if self.backend is not None:
+            self.backend.remover(sessao)
+
+    def _guardar(self, sessao, estado, versao):
+        anterior = self._sessoes.pop(sessao, None)
+        if anterior is not None:
+            self._tamanho_total -= anterior[1]
+
+        tamanho = estimar_tamanho(estado)
+        self._sessoes[sessao] = (estado, tamanho, versao)
+        self._tamanho_total += tamanho
+
+        # Despeja as sessões usadas há mais tempo, mantendo sempre a atual
+        while self._tamanho_total > self.capacidade_bytes and len(self._sessoes) > 1:
+            _, (_, tamanho_despejado, _) = self._sessoes.popitem(last=False)
+            self._tamanho_total -= tamanho_despejado
+
+    def __len__(self):
+        return len(self._sessoes)
@@ -0,0 +1,155 @@
+import multiprocessing
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+
+from scc import tarjan
+
+# Estados possíveis de uma tarefa
+EXECUTANDO = 'executando'
+CONCLUIDA = 'concluida'
+CANCELADA = 'cancelada'
+ERRO = 'erro'
+DESCONHECIDA = 'desconhecida'
+
+
+class TarefaCancelada(Exception):
+    pass
+
+
+class Relatorio:
+    """Canal entre a tarefa (no processo do pool) e o servidor.
+
+    A tarefa chama relatorio(feitos, total) periodicamente: o progresso fica
+    visível para consultar() e, se a tarefa foi cancelada, a chamada levanta
+    TarefaCancelada para interromper o algoritmo.
+    """
+
+    def __init__(self, id_tarefa, progresso, cancelados):
+        self.id_tarefa = id_tarefa
+        self.progresso = progresso
+        self.cancelados = cancelados
+
+    def __call__(self, feitos, total):
+        if self.id_tarefa in self.cancelados:
+            raise TarefaCancelada()
+        self.progresso[self.id_tarefa] = feitos / total if total else 1.0
+
+
+# Algoritmos executados no pool. Recebem o grafo em CSR (GrafoCSR), que é
+# serializado de forma compacta para o processo filho.
+
+def executar_bfs(G, source, relatorio):
+    return G.bfs_arestas(source, progresso=relatorio)
+
+
+def executar_dfs(G, source, relatorio):
+    return G.dfs_arestas(source, progresso=relatorio)
+
+
+def executar_scc(G, relatorio):
+    return G.rotulos, tarjan(G.offsets, G.indices, progresso=relatorio)
+
+
+def _executar(funcao, args, relatorio):
+    try:
+        return funcao(*args, relatorio)
+    finally:
+        relatorio.progresso.pop(relatorio.id_tarefa, None)
+
+
+class ExecutorTarefas:
+    """Executa algoritmos longos em um pool de processos, fora da requisição.
+
+    Cada tarefa recebe um id; consultar(id) informa estado, progresso e o
+    resultado quando concluída. Resultados ficam guardados em um LRU. Os ids
+    só valem no processo que criou a tarefa.
+    """
+
+    def __init__(self, max_workers=None, max_resultados=64):
+        self.max_workers = max_workers
+        self.max_resultados = max_resultados
+        self._pool = None
+        self._gerenciador = None
+        self._futuros = {}  # id -> Future das tarefas em andamento
+        self._resultados = OrderedDict()  # id -> (estado, resultado ou mensagem de erro)
+        # Reentrante: o Future chama _finalizar na mesma thread quando já
+        # terminou (add_done_callback) ou quando é cancelado na fila
+        self._lock = threading.RLock()
+
+    def _iniciar(self):
+        # O pool e o gerenciador de memória compartilhada só sobem na primeira tarefa
+        if self._pool is None:
+            self._gerenciador = multiprocessing.Manager()
+            self._progresso = self._gerenciador.dict()
+            self._cancelados = self._gerenciador.dict()
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+
+    def submeter(self, funcao, *args):
+        with self._lock:
+            self._iniciar()
+            id_tarefa = uuid.uuid4().hex
+            relatorio = Relatorio(id_tarefa, self._progresso, self._cancelados)
+            self._progresso[id_tarefa] = 0.0
+            futuro = self._pool.submit(_executar, funcao, args, relatorio)
+            self._futuros[id_tarefa] = futuro
+            # Finaliza assim que terminar, mesmo que ninguém volte a consultar
+            futuro.add_done_callback(lambda futuro: self._finalizar(id_tarefa, futuro))
+            return id_tarefa
+
+    def consultar(self, id_tarefa):
+        with self._lock:
+            futuro = self._futuros.get(id_tarefa)
+            if futuro is not None and futuro.done():
+                self._finalizar(id_tarefa, futuro)
+                futuro = None
+
+            if futuro is not None:
+                return {'estado': EXECUTANDO, 'progresso': self._progresso.get(id_tarefa, 0.0)}
+
+            if id_tarefa not in self._resultados:
+                return {'estado': DESCONHECIDA}
+            self._resultados.move_to_end(id_tarefa)
+            estado, valor = self._resultados[id_tarefa]
+            if estado == CONCLUIDA:
+                return {'estado': CONCLUIDA, 'progresso': 1.0, 'resultado': valor}
+            if estado == ERRO:
+                return {'estado': ERRO, 'erro': valor}
+            return {'estado': estado}
+
+    def cancelar(self, id_tarefa):
+        with self._lock:
+            futuro = self._futuros.get(id_tarefa)
+            if futuro is None:
+                return False
+            # Tarefas na fila são canceladas direto; as que já estão rodando
+            # são interrompidas na próxima chamada do relatório. Em ambos os
+            # casos o resultado é descartado em _finalizar
+            self._cancelados[id_tarefa] = True
+            futuro.cancel()
+            return True
+
+    def _finalizar(self, id_tarefa, futuro):
+        with self._lock:
+            if self._futuros.pop(id_tarefa, None) is None:
+                return  # Já finalizada (pelo callback do Future ou por consultar)
+            cancelada = self._cancelados.pop(id_tarefa, None) is not None
+            self._progresso.pop(id_tarefa, None)
+            try:
+                if cancelada:
+                    raise TarefaCancelada()
+                self._resultados[id_tarefa] = (CONCLUIDA, futuro.result())
+            except (CancelledError, TarefaCancelada):
+                self._resultados[id_tarefa] = (CANCELADA, None)
+            except Exception as e:
+                self._resultados[id_tarefa] = (ERRO, str(e))
+
+            while len(self._resultados) > self.max_resultados:
+                self._resultados.popitem(last=False)
+
+    def encerrar(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._gerenciador.shutdown()
+            self._pool = None
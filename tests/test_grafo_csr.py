@@ -0,0 +1,137 @@
+import random
+
+import networkx as nx
+import numpy as np
+import pytest
+
+import grafo_csr
+from grafo_csr import GrafoCSR, TabelaRotulos
+
+
+def grafo_aleatorio(semente, n=30, m=70):
+    G = nx.gnm_random_graph(n, m, seed=semente, directed=True)
+    G = nx.relabel_nodes(G, {v: f"v{v}" for v in G})
+    rnd = random.Random(semente)
+    for u, v, data in G.edges(data=True):
+        if rnd.random() < 0.5:
+            data['weight'] = float(rnd.randint(1, 9))
+    return G
+
+
+def arestas(G):
+    return sorted((u, v, data.get('weight')) for u, v, data in G.edges(data=True))
+
+
+@pytest.mark.parametrize('semente', range(30))
+def test_bfs_e_dfs_iguais_ao_networkx(semente):
+    G = grafo_aleatorio(semente)
+    csr = GrafoCSR.de_networkx(G)
+    for origem in list(G)[:5]:
+        assert csr.bfs_arestas(origem) == list(nx.bfs_edges(G, origem))
+        assert csr.dfs_arestas(origem) == list(nx.dfs_edges(G, origem))
+
+
+def test_busca_em_caminho_longo():
+    n = 100_000
+    G = nx.DiGraph(zip(range(n - 1), range(1, n)))
+    csr = GrafoCSR.de_networkx(G)
+    assert csr.dfs_arestas(0) == list(nx.dfs_edges(G, 0))
+    assert csr.bfs_arestas(0) == list(nx.bfs_edges(G, 0))
+
+
+def test_busca_progresso(monkeypatch):
+    monkeypatch.setattr(grafo_csr, 'INTERVALO_PROGRESSO', 2)
+    csr = GrafoCSR.de_networkx(nx.DiGraph([(0, 1), (1, 2), (2, 3), (3, 4)]))
+    chamadas = []
+    csr.bfs_arestas(0, progresso=lambda v, t: chamadas.append((v, t)))
+    assert chamadas == [(2, 5), (4, 5)]
+
+
+def test_busca_vertice_inexistente():
+    csr = GrafoCSR.de_networkx(nx.DiGraph([(0, 1)]))
+    with pytest.raises(ValueError, match="Vértice não existe."):
+        csr.bfs_arestas(7)
+
+
+@pytest.mark.parametrize('semente', range(10))
+def test_consultas_iguais_ao_networkx(semente):
+    G = grafo_aleatorio(semente)
+    csr = GrafoCSR.de_networkx(G)
+    assert csr.number_of_nodes() == len(csr) == G.number_of_nodes()
+    assert csr.number_of_edges() == G.number_of_edges()
+    assert list(csr.nodes()) == list(G.nodes())
+    assert arestas(csr) == arestas(G)
+    assert arestas(csr.para_networkx()) == arestas(G)
+    for u in G:
+        assert sorted(csr.successors(u)) == sorted(G.successors(u))
+        incidentes = sorted((a, b, data.get('weight')) for a, b, data in csr.arestas_incidentes(u))
+        esperadas = {(a, b, data.get('weight')) for a, b, data in G.in_edges(u, data=True)}
+        esperadas |= {(a, b, data.get('weight')) for a, b, data in G.out_edges(u, data=True)}
+        assert incidentes == sorted(esperadas)
+    for u, v, data in G.edges(data=True):
+        assert csr.has_edge(u, v)
+        assert csr.peso(u, v) == data.get('weight')
+    assert not csr.has_edge('v0', 'inexistente')
+
+
+@pytest.mark.parametrize('semente', range(20))
+def test_alteracoes_iguais_ao_networkx(semente):
+    rnd = random.Random(semente)
+    G = grafo_aleatorio(semente, n=12, m=20)
+    csr = GrafoCSR.de_networkx(G)
+    for passo in range(60):
+        operacao = rnd.random()
+        if operacao < 0.4 and G.number_of_nodes():
+            u, v = rnd.choice(list(G)), rnd.choice(list(G))
+            peso = rnd.choice([None, float(passo)])
+            csr.adicionar_aresta(u, v, peso)
+            if peso is None:
+                G.add_edge(u, v)
+            else:
+                G.add_edge(u, v, weight=peso)
+        elif operacao < 0.7 and G.number_of_edges():
+            u, v = rnd.choice(list(G.edges()))
+            csr.remover_aresta(u, v)
+            G.remove_edge(u, v)
+        elif operacao < 0.85 and G.number_of_nodes():
+            u = rnd.choice(list(G))
+            csr.remover_vertice(u)
+            G.remove_node(u)
+        else:
+            csr.adicionar_vertice(f"n{passo}")
+            G.add_node(f"n{passo}")
+        assert list(csr.nodes()) == list(G.nodes())
+        assert arestas(csr) == arestas(G)
+        assert all(csr.ids[u] == i for i, u in enumerate(G))
+
+
+def test_de_arestas_repetidas_como_no_networkx():
+    from graph_logic import carregar_arestas_numpy, carregar_grafo_txt
+    # A última repetição vale, mas uma repetição sem peso não apaga o peso anterior
+    dados = b"3 5\na b 1\nb c 3\na b 2\nb c\nc a\n"
+    csr = GrafoCSR.de_arestas(carregar_arestas_numpy(dados))
+    assert list(csr.nodes()) == ['a', 'b', 'c']
+    assert arestas(csr) == [('a', 'b', 2.0), ('b', 'c', 3.0), ('c', 'a', None)]
+    assert arestas(csr) == arestas(carregar_grafo_txt(dados)[0])
+
+
+def test_tabela_rotulos():
+    tabela = TabelaRotulos(np.frombuffer('a\nção\nbc'.encode('utf-8'), dtype=np.uint8))
+    assert len(tabela) == 3
+    assert list(tabela) == ['a', 'ção', 'bc']
+    assert (tabela[0], tabela[1], tabela[-1]) == ('a', 'ção', 'bc')
+    assert tabela[1:] == ['ção', 'bc']
+    with pytest.raises(IndexError):
+        tabela[3]
+    assert list(TabelaRotulos(np.zeros(0, dtype=np.uint8))) == []
+
+
+def test_tabela_rotulos_vira_lista_ao_alterar():
+    tabela = TabelaRotulos(np.frombuffer(b'a\nb', dtype=np.uint8))
+    csr = GrafoCSR(tabela, [0, 1, 1], [1], [np.nan])
+    assert csr.ids == {'a': 0, 'b': 1}
+    csr.adicionar_vertice('c')
+    assert csr.rotulos == ['a', 'b', 'c']
+    csr.remover_vertice('a')
+    assert csr.ids == {'b': 0, 'c': 1}
+    assert list(csr.edges()) == []
@@ -0,0 +1,194 @@
+import json
+import random
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from grafo_csr import GrafoCSR, TabelaRotulos
+from graph_logic import (
+    EstadoGrafo,
+    carregar_arestas_numpy, carregar_grafo_bin, carregar_grafo_csr, carregar_grafo_txt,
+    gerar_elementos_cytoscape, peso_aresta, salvar_grafo_bin, salvar_grafo_txt,
+)
+
+
+def arestas(G):
+    return sorted((u, v, data.get('weight')) for u, v, data in G.edges(data=True))
+
+
+def texto_aleatorio(semente):
+    # Lista de arestas com rótulos acentuados, longos, pesos e separadores variados
+    rnd = random.Random(semente)
+    rotulos = ['a', 'b', 'ção', 'x' * 70, '10', 'é' * 40, 'Z9']
+    linhas = []
+    for _ in range(rnd.randint(0, 25)):
+        u, v = rnd.choice(rotulos), rnd.choice(rotulos)
+        peso = f" {rnd.randint(-5, 5) / 2}" if rnd.random() < 0.4 else ''
+        linhas.append(rnd.choice([' ', '\t', '  ']).join([u, v]) + peso + rnd.choice(['\n', '\r\n']))
+    vertices = len({t for linha in linhas for t in linha.split()[:2]})
+    return (f"{vertices} {len(linhas)}\n" + ''.join(linhas)).encode('utf-8')
+
+
+@pytest.mark.parametrize('semente', range(40))
+def test_carregadores_txt_e_csr_iguais(semente):
+    dados = texto_aleatorio(semente)
+    G, ponderado, _ = carregar_grafo_txt(dados)
+    csr, ponderado_csr, _ = carregar_grafo_csr(dados)
+    assert list(csr.nodes()) == list(G.nodes())
+    assert arestas(csr) == arestas(G)
+    assert ponderado_csr == ponderado
+
+
+@pytest.mark.parametrize('dados, mensagem', [
+    (b"3 2\n0 1\n\n1 2\n", "Formato de aresta inválido."),
+    (b"3 1\n0 1\n\n", "Formato de aresta inválido."),
+    (b"3 1\n0\n", "Formato de aresta inválido."),
+    (b"3 1\n0 1 2 3\n", "Formato de aresta inválido."),
+    (b"3 2\n0 1\n", "Arquivo truncado: esperadas 2 arestas, encontradas 1."),
+    (b"3 1\n0 1\n1 2\n", "O arquivo possui mais arestas do que as 1 informadas no cabeçalho."),
+    (b"1 1\n0 1\n", "O arquivo possui mais vértices do que os 1 informados no cabeçalho."),
+    (b"3\n0 1\n", "Formato de arquivo inválido."),
+])
+def test_carregadores_rejeitam_os_mesmos_arquivos(dados, mensagem):
+    with pytest.raises(ValueError, match=mensagem):
+        carregar_grafo_txt(dados)
+    with pytest.raises(ValueError, match=mensagem):
+        carregar_arestas_numpy(dados)
+
+
+def test_carregar_arestas_numpy_sem_arestas():
+    arestas_numpy = carregar_arestas_numpy(b"3 0\n")
+    assert len(arestas_numpy.rotulos) == 0 and arestas_numpy.origem.size == 0
+
+
+@pytest.mark.parametrize('semente', range(10))
+def test_salvar_e_carregar_txt(tmp_path, semente):
+    G, _, _ = carregar_grafo_txt(texto_aleatorio(semente))
+    caminho = str(tmp_path / 'grafo.txt.gz')
+    salvar_grafo_txt(GrafoCSR.de_networkx(G), caminho)
+    H, _, _ = carregar_grafo_txt(caminho)
+    assert arestas(H) == arestas(G)
+
+
+@pytest.mark.parametrize('orientado', [True, False])
+@pytest.mark.parametrize('semente', range(10))
+def test_snapshot_bin(tmp_path, semente, orientado):
+    G, ponderado, _ = carregar_grafo_txt(texto_aleatorio(semente))
+    G.add_node('isolado')
+    if not orientado:
+        G = G.to_undirected()
+    caminho = str(tmp_path / 'grafo.bin')
+    salvar_grafo_bin(G, caminho)
+
+    with open(caminho, 'rb') as f:
+        dados = f.read()
+    for origem in (caminho, dados):
+        H, ponderado_bin, orientado_bin = carregar_grafo_bin(origem)
+        assert (ponderado_bin, orientado_bin) == (ponderado, orientado)
+        assert H.is_directed() == orientado
+        assert sorted(H.nodes()) == sorted(G.nodes())
+        if orientado:
+            assert isinstance(H.rotulos, TabelaRotulos)
+            assert arestas(H) == arestas(G)
+        else:
+            assert sorted(map(sorted, H.edges())) == sorted(map(sorted, G.edges()))
+
+    if orientado:
+        # Regravar sem alterações reaproveita a tabela de rótulos do arquivo
+        salvar_grafo_bin(H, str(tmp_path / 'copia.bin'))
+        assert (tmp_path / 'copia.bin').read_bytes() == dados
+
+
+def test_snapshot_bin_invalido(tmp_path):
+    caminho = str(tmp_path / 'grafo.bin')
+    salvar_grafo_bin(nx.DiGraph([('a', 'b')]), caminho)
+    with open(caminho, 'rb') as f:
+        dados = f.read()
+    with pytest.raises(ValueError, match="Arquivo truncado."):
+        carregar_grafo_bin(dados[:-16])
+    with pytest.raises(ValueError, match="Formato de arquivo inválido."):
+        carregar_grafo_bin(b'X' + dados[1:])
+
+
+def sem_posicao(elementos, orientado):
+    # Elementos comparáveis independentemente da ordem e do layout; sem
+    # orientação, a aresta pode estar em qualquer um dos sentidos
+    resultado = []
+    for elemento in elementos:
+        elemento = json.loads(json.dumps(elemento))
+        elemento.pop('position', None)
+        data = elemento['data']
+        if 'source' in data and not orientado:
+            data['source'], data['target'] = sorted([data['source'], data['target']])
+        resultado.append(json.dumps(elemento, sort_keys=True))
+    return sorted(resultado)
+
+
+def aplicar(cliente, operacoes):
+    # Mesmas operações que o navegador aplica (ver app.elementos_para_cliente)
+    for operacao, indice, elemento in operacoes:
+        if operacao == 'definir':
+            cliente[indice] = elemento
+        elif operacao == 'acrescentar':
+            cliente.append(elemento)
+        else:
+            assert indice == len(cliente) - 1
+            cliente.pop()
+
+
+@pytest.mark.parametrize('orientado', [True, False])
+@pytest.mark.parametrize('backend', ['networkx', 'csr'])
+@pytest.mark.parametrize('semente', range(15))
+def test_cache_elementos_acompanha_o_grafo(semente, backend, orientado):
+    rnd = random.Random(semente)
+    G, _, _ = carregar_grafo_txt(texto_aleatorio(semente))
+    estado = EstadoGrafo(GrafoCSR.de_networkx(G) if backend == 'csr' else G)
+    estado.definir_orientacao(orientado)
+    cliente = estado.elementos.completa()
+    estado.elementos.alteracoes()
+
+    for passo in range(40):
+        vertices = list(estado.G.nodes())
+        operacao = rnd.random()
+        if operacao < 0.35 and vertices:
+            estado.adicionar_aresta(rnd.choice(vertices), rnd.choice(vertices),
+                                    rnd.choice([None, float(passo)]))
+        elif operacao < 0.55 and estado.num_arestas:
+            estado.remover_aresta(*rnd.choice(list(estado.G.edges())))
+        elif operacao < 0.7 and estado.num_arestas:
+            estado.definir_peso(*rnd.choice(list(estado.G.edges())), passo)
+        elif operacao < 0.8 and vertices:
+            estado.remover_vertice(rnd.choice(vertices))
+        else:
+            estado.adicionar_vertice(f"n{passo}")
+
+        operacoes = estado.elementos.alteracoes()
+        if operacoes is None:
+            cliente = estado.elementos.completa()
+        else:
+            aplicar(cliente, operacoes)
+        esperado = gerar_elementos_cytoscape(estado.G)
+        assert sem_posicao(cliente, orientado) == sem_posicao(esperado, orientado)
+        assert estado.num_arestas == estado.G.number_of_edges()
+        # Na vista não orientada o peso vem dos dois sentidos guardados (ver peso_aresta)
+        assert estado.arestas_ponderadas == sum(
+            1 for u, v in estado.G.edges() if peso_aresta(estado.G, u, v) is not None
+        )
+        assert all('position' in e for e in cliente if 'source' not in e['data'])
+
+
+@pytest.mark.parametrize('backend', ['networkx', 'csr'])
+def test_tornar_ponderado_e_remover_pesos(backend):
+    G = nx.DiGraph([('a', 'b'), ('b', 'c')])
+    G['a']['b']['weight'] = 5.0
+    estado = EstadoGrafo(GrafoCSR.de_networkx(G) if backend == 'csr' else G)
+    estado.tornar_ponderado(2)
+    assert arestas(estado.G) == [('a', 'b', 5.0), ('b', 'c', 2.0)]
+    assert estado.ponderado
+    estado.remover_pesos()
+    assert arestas(estado.G) == [('a', 'b', None), ('b', 'c', None)]
+    assert not estado.ponderado
+    estado.definir_orientacao(False)
+    assert not estado.G.is_directed() and estado.num_arestas == 2
+    assert np.isnan(GrafoCSR.de_networkx(estado.armazem).pesos).all()
@@ -0,0 +1,120 @@
+import random
+
+import networkx as nx
+import numpy as np
+import pytest
+
+import scc
+from grafo_csr import GrafoCSR
+from scc import ComponentesDinamicas, agrupar_componentes, componentes_grafo, tarjan
+
+
+def conjuntos(rotulos, componente):
+    return sorted(sorted(map(str, nos)) for nos in agrupar_componentes(rotulos, componente))
+
+
+def conjuntos_nx(G):
+    return sorted(sorted(map(str, nos)) for nos in nx.strongly_connected_components(G))
+
+
+def grafo_aleatorio(semente, max_vertices=15, max_arestas=25):
+    rnd = random.Random(semente)
+    return nx.gnm_random_graph(rnd.randint(1, max_vertices), rnd.randint(0, max_arestas),
+                               seed=semente, directed=True)
+
+
+@pytest.mark.parametrize('semente', range(50))
+def test_tarjan_igual_ao_networkx(semente):
+    G = grafo_aleatorio(semente, max_vertices=40, max_arestas=80)
+    csr = GrafoCSR.de_networkx(G)
+    assert conjuntos(csr.rotulos, tarjan(csr.offsets, csr.indices)) == conjuntos_nx(G)
+
+
+def test_tarjan_numera_em_ordem_topologica_reversa():
+    # a -> b -> c, sem ciclos: c é encontrada primeiro
+    csr = GrafoCSR.de_networkx(nx.DiGraph([('a', 'b'), ('b', 'c')]))
+    componente = tarjan(csr.offsets, csr.indices)
+    assert componente[csr.ids['c']] < componente[csr.ids['b']] < componente[csr.ids['a']]
+
+
+def test_tarjan_caminho_longo_sem_recursao():
+    n = 200_000
+    offsets = np.arange(n + 1, dtype=np.int64)
+    offsets[-1] = n - 1
+    indices = np.arange(1, n, dtype=np.int32)
+    componente = tarjan(offsets, indices)
+    assert len(set(componente.tolist())) == n
+
+    # Fechando o caminho em um ciclo, tudo vira uma componente só
+    indices = np.append(indices, 0)
+    offsets[-1] = n
+    assert len(set(tarjan(offsets, indices).tolist())) == 1
+
+
+def test_tarjan_progresso(monkeypatch):
+    monkeypatch.setattr(scc, 'INTERVALO_PROGRESSO', 4)
+    chamadas = []
+    tarjan([0, 1, 2, 3, 4, 5, 6, 7, 8, 8], list(range(1, 9)), progresso=lambda v, t: chamadas.append((v, t)))
+    assert chamadas == [(4, 9), (8, 9)]
+
+
+def verificar(dinamicas, G, H):
+    assert conjuntos(*dinamicas.componentes(H)) == conjuntos_nx(G)
+    # Toda aresta entre componentes vai para um intervalo posterior na ordem
+    for u, v in G.edges():
+        cu, cv = dinamicas.componente[u], dinamicas.componente[v]
+        if cu != cv:
+            assert dinamicas.ordem[cu] < dinamicas.ordem[cv]
+    intervalos = sorted((dinamicas.ordem[c], dinamicas.largura[c]) for c in dinamicas.ordem)
+    for (inicio, largura), (proximo, _) in zip(intervalos, intervalos[1:]):
+        assert inicio + largura <= proximo
+    assert set(dinamicas.ordem) == set(dinamicas.membros)
+
+
+# Com intervalos estreitos, as inserções esgotam o espaço e forçam a renumeração
+@pytest.mark.parametrize('espaco', [scc.ESPACO_ORDEM, 4, 1])
+@pytest.mark.parametrize('backend', ['networkx', 'csr'])
+@pytest.mark.parametrize('semente', range(40))
+def test_componentes_dinamicas_igual_ao_networkx(monkeypatch, espaco, backend, semente):
+    monkeypatch.setattr(scc, 'ESPACO_ORDEM', espaco)
+    rnd = random.Random(semente)
+    G = grafo_aleatorio(semente)
+    H = GrafoCSR.de_networkx(G) if backend == 'csr' else G
+    dinamicas = ComponentesDinamicas()
+    dinamicas.componentes(H)
+
+    for _ in range(40):
+        operacao = rnd.random()
+        if operacao < 0.5 and G.number_of_nodes():
+            u, v = rnd.choice(list(G)), rnd.choice(list(G))
+            if G.has_edge(u, v):
+                continue
+            if H is not G:
+                H.adicionar_aresta(u, v)
+            G.add_edge(u, v)
+            dinamicas.adicionar_aresta(H, u, v)
+        elif operacao < 0.8 and G.number_of_edges():
+            u, v = rnd.choice(list(G.edges()))
+            if H is not G:
+                H.remover_aresta(u, v)
+            G.remove_edge(u, v)
+            dinamicas.remover_aresta(H, u, v)
+        elif operacao < 0.9 and G.number_of_nodes():
+            u = rnd.choice(list(G))
+            if H is not G:
+                H.remover_vertice(u)
+            G.remove_node(u)
+            dinamicas.remover_vertice(H, u)
+        else:
+            u = max(G, default=0) + 1
+            if H is not G:
+                H.adicionar_vertice(u)
+            G.add_node(u)
+            dinamicas.adicionar_vertice(u)
+        verificar(dinamicas, G, H)
+
+
+def test_componentes_grafo_nao_orientado():
+    G = nx.Graph([(1, 2), (3, 4)])
+    G.add_node(5)
+    assert conjuntos(*componentes_grafo(G)) == [['1', '2'], ['3', '4'], ['5']]
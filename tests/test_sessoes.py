@@ -0,0 +1,107 @@
+import os
+import uuid
+
+import networkx as nx
+import pytest
+
+import sessoes
+from graph_logic import EstadoGrafo
+from sessoes import ArmazemSessoes, BackendDisco, estimar_tamanho, validar_sessao
+
+
+def nova_sessao():
+    return uuid.uuid4().hex
+
+
+@pytest.mark.parametrize('sessao', [
+    None, '', '../fora', 'A' * 32, '0' * 31, '0' * 33, '0' * 32 + '\n', '../' + '0' * 29,
+])
+def test_sessao_invalida(tmp_path, sessao):
+    with pytest.raises(ValueError, match="Sessão inválida."):
+        validar_sessao(sessao)
+    armazem = ArmazemSessoes(EstadoGrafo, 1 << 30, BackendDisco(str(tmp_path)))
+    with pytest.raises(ValueError, match="Sessão inválida."):
+        armazem.obter(sessao)
+    with pytest.raises(ValueError, match="Sessão inválida."):
+        armazem.salvar(sessao, EstadoGrafo())
+    assert os.listdir(tmp_path) == []
+
+
+def test_backend_disco_nao_sai_do_diretorio(tmp_path):
+    # Um link simbólico com o nome de uma sessão não pode levar para fora do diretório
+    diretorio = tmp_path / 'sessoes'
+    backend = BackendDisco(str(diretorio))
+    sessao = nova_sessao()
+    os.symlink(tmp_path / 'fora.pkl', diretorio / f"{sessao}.pkl")
+    with pytest.raises(ValueError, match="Sessão inválida."):
+        backend.salvar(sessao, EstadoGrafo())
+    assert not (tmp_path / 'fora.pkl').exists()
+
+
+def test_sessoes_independentes():
+    armazem = ArmazemSessoes(EstadoGrafo, 1 << 30)
+    a, b = nova_sessao(), nova_sessao()
+    armazem.obter(a).adicionar_vertice('x')
+    assert armazem.obter(a).G.number_of_nodes() == 1
+    assert armazem.obter(b).G.number_of_nodes() == 0
+    armazem.remover(a)
+    assert armazem.obter(a).G.number_of_nodes() == 0
+
+
+def test_lru_despeja_a_menos_usada():
+    estado = EstadoGrafo(nx.DiGraph([(i, i + 1) for i in range(100)]))
+    armazem = ArmazemSessoes(EstadoGrafo, 2 * estimar_tamanho(estado) + 1)
+    a, b, c = nova_sessao(), nova_sessao(), nova_sessao()
+    for sessao in (a, b):
+        armazem.salvar(sessao, EstadoGrafo(nx.DiGraph(estado.G)))
+    armazem.obter(a)  # 'b' passa a ser a usada há mais tempo
+    armazem.salvar(c, EstadoGrafo(nx.DiGraph(estado.G)))
+    assert len(armazem) == 2
+    assert armazem.obter(a).G.number_of_nodes() == 101
+    assert armazem.obter(b).G.number_of_nodes() == 0  # Despejada: recriada vazia
+
+
+def test_backend_compartilhado_entre_processos(tmp_path):
+    # Dois armazéns sobre o mesmo diretório simulam dois workers
+    primeiro = ArmazemSessoes(EstadoGrafo, 1 << 30, BackendDisco(str(tmp_path)))
+    segundo = ArmazemSessoes(EstadoGrafo, 1 << 30, BackendDisco(str(tmp_path)))
+    sessao = nova_sessao()
+
+    estado = primeiro.obter(sessao)
+    estado.adicionar_vertice('a')
+    estado.adicionar_vertice('b')
+    estado.adicionar_aresta('a', 'b', 2.0)
+    primeiro.salvar(sessao, estado)
+    recarregado = segundo.obter(sessao)
+    assert list(recarregado.G.edges(data=True)) == [('a', 'b', {'weight': 2.0})]
+    assert recarregado.elementos.completa()  # Caches refeitos ao carregar
+
+    recarregado.adicionar_vertice('c')
+    segundo.salvar(sessao, recarregado)
+    assert sorted(primeiro.obter(sessao).G.nodes()) == ['a', 'b', 'c']
+
+
+def test_salvar_sem_alteracao_nao_grava(tmp_path):
+    backend = BackendDisco(str(tmp_path))
+    armazem = ArmazemSessoes(EstadoGrafo, 1 << 30, backend)
+    sessao = nova_sessao()
+    estado = armazem.obter(sessao)
+    armazem.salvar(sessao, estado, alterado=False)
+    assert backend.versao(sessao) is None
+
+    armazem.salvar(sessao, estado)
+    versao = backend.versao(sessao)
+    armazem.salvar(sessao, estado, alterado=False)
+    assert backend.versao(sessao) == versao
+    assert armazem.obter(sessao) is estado  # A versão guardada continua a do arquivo
+
+
+def test_limpeza_por_ttl(tmp_path, monkeypatch):
+    monkeypatch.setattr(sessoes, 'INTERVALO_LIMPEZA', 0)
+    backend = BackendDisco(str(tmp_path), ttl=60)
+    antiga, atual = nova_sessao(), nova_sessao()
+    backend.salvar(antiga, EstadoGrafo())
+    os.utime(tmp_path / f"{antiga}.pkl", (0, 0))
+    backend.salvar(atual, EstadoGrafo())
+    assert backend.versao(antiga) is None
+    assert backend.versao(atual) is not None